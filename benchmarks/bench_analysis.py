@@ -0,0 +1,52 @@
+"""Benchmark the vectorized analytics in analysis/performance_analysis.py.
+
+Run from the repository root:
+
+    python benchmarks/bench_analysis.py --sizes 10000 1000000 10000000
+"""
+import argparse
+
+import numpy as np
+
+from common import time_call
+from analysis.performance_analysis import (
+    calculate_average_performance,
+    get_top_performers,
+    student_averages,
+    to_score_matrix,
+    top_k_indices,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--dict-limit', type=int, default=1_000_000,
+                        help='skip the list-of-dicts benchmarks above this many students')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'students':>12} {'benchmark':<32} {'seconds':>9}")
+    for size in args.sizes:
+        scores = rng.integers(0, 101, size=(size, 5), dtype=np.uint8)
+        matrix = scores.astype(np.float64)
+        averages = student_averages(matrix)
+        results = {
+            'row means (student_averages)': time_call(student_averages, matrix, repeat=args.repeat),
+            'column means': time_call(matrix.mean, axis=0, repeat=args.repeat),
+            'top-10 (argpartition)': time_call(top_k_indices, averages, 10, repeat=args.repeat),
+            'top-10 (full argsort)': time_call(np.argsort, -averages, repeat=args.repeat),
+        }
+        if size <= args.dict_limit:
+            students = [{'name': f'S{i}', 'scores': row} for i, row in enumerate(scores.tolist())]
+            results['list-of-dicts -> matrix'] = time_call(to_score_matrix, students, repeat=args.repeat)
+            results['calculate_average_performance'] = time_call(
+                calculate_average_performance, students, repeat=args.repeat)
+            results['get_top_performers'] = time_call(get_top_performers, students, 10, repeat=args.repeat)
+        for name, seconds in results.items():
+            print(f"{size:>12,} {name:<32} {seconds:>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
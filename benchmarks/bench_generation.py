@@ -0,0 +1,42 @@
+"""Compare the loop, vectorized and multi-process cohort generators.
+
+Run from the repository root:
+
+    python benchmarks/bench_generation.py --sizes 1000 100000 1000000
+"""
+import argparse
+
+from common import time_call
+from data.students_data import generate_students_parallel, get_dataframe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--loop-limit', type=int, default=1_000_000,
+                        help='skip the loop generator above this many students')
+    parser.add_argument('--workers', type=int, nargs='+', default=[],
+                        help='also time generate_students_parallel with these worker counts')
+    args = parser.parse_args()
+
+    header = f"{'students':>12} {'loop (s)':>10} {'vectorized (s)':>15} {'speedup':>8}"
+    for workers in args.workers:
+        header += f" {f'{workers} workers (s)':>16}"
+    print(header)
+    for size in args.sizes:
+        vectorized = time_call(get_dataframe, size, vectorized=True, repeat=args.repeat)
+        if size <= args.loop_limit:
+            loop = time_call(get_dataframe, size, repeat=1 if size >= 100_000 else args.repeat)
+            row = f"{size:>12,} {loop:>10.3f} {vectorized:>15.3f} {loop / vectorized:>7.1f}x"
+        else:
+            row = f"{size:>12,} {'-':>10} {vectorized:>15.3f} {'-':>8}"
+        for workers in args.workers:
+            parallel = time_call(generate_students_parallel, size, max_workers=workers,
+                                 num_shards=max(args.workers), repeat=args.repeat)
+            row += f" {parallel:>16.3f}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark the dashboard's import time with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter after ``--preload`` (streamlit
+by default, since the server has already loaded it when the script first
+runs). The ``-X importtime`` report is parsed for the module's cumulative
+import time and its slowest direct imports. The run fails if the best time
+over ``--repeat`` runs is above ``--target-ms``, or if a module listed in
+``--forbid`` was imported.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --modules app utils.figures --target-ms 800
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+from common import ROOT_DIR, SRC_DIR
+
+# "import time: self [us] | cumulative | imported package", indented by depth
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """Return (cumulative_us, depth, module) for every line of a -X importtime report"""
+    entries = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            _, cumulative, indent, module = match.groups()
+            entries.append((int(cumulative), len(indent) // 2, module))
+    return entries
+
+
+def measure(module, preload):
+    """Return the -X importtime entries of importing ``module`` after ``preload``"""
+    statements = [f'import {name}' for name in preload] + ['import sys', 'sys.stderr.write("-- target --\\n")',
+                                                            f'import {module}']
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, ROOT_DIR]))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', '; '.join(statements)],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr.split('-- target --', 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=['app'])
+    parser.add_argument('--preload', nargs='*', default=['streamlit'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help='slowest direct imports to list')
+    parser.add_argument('--target-ms', type=float, default=800.0)
+    parser.add_argument('--forbid', nargs='*', default=['matplotlib', 'plotly.express'],
+                        help='fail if any of these modules is imported')
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        runs = [measure(module, args.preload) for _ in range(args.repeat)]
+        best = min(runs, key=lambda entries: entries[-1][0])
+        total_ms = best[-1][0] / 1000
+        print(f"{module}: {total_ms:.0f} ms (best of {args.repeat}, target {args.target_ms:.0f} ms)")
+        children = sorted((entry for entry in best if entry[1] == 1), reverse=True)[:args.top]
+        for cumulative, _, name in children:
+            print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+        imported = {name for _, _, name in best}
+        forbidden = sorted(name for name in imported
+                           if any(name == prefix or name.startswith(prefix + '.') for prefix in args.forbid))
+        if forbidden:
+            print(f"  imports {', '.join(forbidden)}")
+        if total_ms > args.target_ms or forbidden:
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark marksheet ingestion (src/data/ingest.py) in rows per second.
+
+Generated cohorts are written as CSV marksheets split over ``--files`` files,
+then ingested into a temporary cohort store with each worker count.
+
+Run from the repository root:
+
+    python benchmarks/bench_ingest.py --sizes 100000 1000000 --files 4 --workers 1 4
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from common import time_call
+from data.ingest import ingest_marksheets
+from data.students_data import generate_students_frame
+
+# Derived columns are recomputed on ingestion, so marksheets leave them out
+DERIVED_COLUMNS = ['total_marks', 'percentage', 'grade', 'status']
+
+
+def write_marksheets(directory, size, files):
+    """Write a generated cohort of ``size`` students as ``files`` CSV files"""
+    df = generate_students_frame(size).drop(columns=DERIVED_COLUMNS)
+    paths = []
+    for k, rows in enumerate(np.array_split(np.arange(size), files)):
+        path = os.path.join(directory, f'marksheet-{k}.csv')
+        df.iloc[rows].to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'students':>12} {'workers':>8} {'seconds':>9} {'rows/s':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            paths = write_marksheets(directory, size, args.files)
+            for workers in args.workers:
+                seconds = time_call(ingest_marksheets, os.path.join(directory, 'store'), paths,
+                                    max_workers=workers, repeat=args.repeat)
+                print(f"{size:>12,} {workers:>8} {seconds:>9.3f} {size / seconds:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark concurrent sessions loading the same cohort, with and without the registry.
+
+Each of ``--sessions`` threads asks for the same cohort at once, either by
+generating its own copy (as every session did before) or through a
+``CohortRegistry``. The table shows the wall time until every session has its
+frame, how many loads ran, and the memory held by the frames the sessions
+end up with.
+
+Run from the repository root:
+
+    python benchmarks/bench_sessions.py --students 1000000 --sessions 1 10 50
+"""
+import argparse
+import tempfile
+import threading
+import time
+
+import common  # noqa: F401  (adds src and the repository root to sys.path)
+from data.cohort_registry import CohortRegistry, resident_nbytes
+from data.students_data import generate_students_frame
+
+
+def run_sessions(sessions, get_frame):
+    """Return (seconds, frames) for ``sessions`` threads calling ``get_frame`` together"""
+    frames = [None] * sessions
+    barrier = threading.Barrier(sessions)
+
+    def session(i):
+        barrier.wait()
+        frames[i] = get_frame()
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, frames
+
+
+def held_bytes(frames):
+    distinct = {id(frame): frame for frame in frames}
+    return sum(resident_nbytes(frame) for frame in distinct.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=1_000_000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 50])
+    args = parser.parse_args()
+
+    print(f"{'sessions':>8} {'mode':<16} {'seconds':>9} {'loads':>6} {'held MiB':>9}")
+    for sessions in args.sessions:
+        loads = []
+
+        def load():
+            loads.append(1)
+            return generate_students_frame(args.students)
+
+        seconds, frames = run_sessions(sessions, load)
+        print(f"{sessions:>8} {'per session':<16} {seconds:>9.3f} {len(loads):>6} {held_bytes(frames) / 2**20:>9.1f}")
+        del frames
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            for mode, registry in (('registry', CohortRegistry()),
+                                   ('registry + mmap', CohortRegistry(spill_dir=spill_dir))):
+                loads.clear()
+                seconds, frames = run_sessions(sessions, lambda: registry.acquire('cohort', load))
+                print(f"{sessions:>8} {mode:<16} {seconds:>9.3f} {registry.loads:>6} "
+                      f"{held_bytes(frames) / 2**20:>9.1f}")
+                del frames
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""Shared helpers for the benchmark scripts"""
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+# src for the project modules, the repository root for config.py
+for path in (ROOT_DIR, SRC_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def time_call(func, *args, repeat=3, **kwargs):
+    """Return the best wall time in seconds over ``repeat`` calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
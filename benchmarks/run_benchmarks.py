@@ -0,0 +1,153 @@
+"""Benchmark suite for data generation, statistics and chart building.
+
+Every case runs at each cohort size up to its own limit and records the best
+wall time and the peak traced memory of one call. Results are written as
+JSON; pass a saved result file as ``--baseline`` to flag regressions.
+
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --sizes 50 10000 --baseline bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from common import time_call
+from analysis import performance_analysis
+from analysis.covariance import CovarianceAccumulator
+from analysis.cube import PerformanceCube
+from data.students_data import (
+    generate_students_data,
+    generate_students_frame,
+    get_dataframe,
+    get_subjects,
+    get_summary_stats,
+)
+from utils import charts, figures
+
+DEFAULT_SIZES = [50, 10_000, 1_000_000, 10_000_000]
+
+
+# name -> (largest size to run at, function of the prepared cohort)
+CASES = {
+    'generate_students_data': (100_000, lambda c: generate_students_data(c['size'])),
+    'get_dataframe': (100_000, lambda c: get_dataframe(c['size'])),
+    'get_dataframe_vectorized': (None, lambda c: get_dataframe(c['size'], vectorized=True)),
+    'get_summary_stats': (None, lambda c: get_summary_stats(c['df'])),
+    'cube.from_frame': (None, lambda c: PerformanceCube.from_frame(c['df'], c['subjects'])),
+    'covariance.from_frame': (None, lambda c: CovarianceAccumulator.from_frame(c['df'], c['subjects'])),
+    'cube.mean_by_semester': (None, lambda c: c['cube'].mean('semester', status=['Pass'])),
+    'figures.compute_aggregates': (None, lambda c: figures.compute_aggregates(c['df'], c['subjects'])),
+    'analysis.to_score_matrix': (None, lambda c: performance_analysis.to_score_matrix(c['df'])),
+    'analysis.get_subject_wise_average': (None, lambda c: performance_analysis.get_subject_wise_average(c['df'])),
+    'analysis.get_top_performers': (None, lambda c: performance_analysis.get_top_performers(c['df'], 10)),
+    'analysis.calculate_pass_rate': (1_000_000, lambda c: performance_analysis.calculate_pass_rate(c['df'])),
+    'charts.create_binned_histogram': (None, lambda c: charts.create_binned_histogram(
+        c['df']['percentage'], 20, 'histogram')),
+    'charts.create_quantile_box_plot': (None, lambda c: charts.create_quantile_box_plot(
+        {s: c['df'][s].to_numpy() for s in c['subjects']}, 'box')),
+    'charts.create_sampled_scatter_plot': (None, lambda c: charts.create_sampled_scatter_plot(
+        c['df'], 'attendance', 'percentage', 'grade', 'scatter')),
+    'charts.create_density_heatmap': (None, lambda c: charts.create_density_heatmap(
+        c['df'], 'attendance', 'percentage', 'density')),
+}
+# Every dashboard figure, built from the precomputed aggregates
+CASES.update({
+    f'figures.{name}': (None, build) for name, build in figures.FIGURES.items()
+})
+
+
+def peak_memory(func, *args):
+    """Return the peak memory in bytes traced while running ``func`` once"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes, selected, repeat):
+    results = []
+    for size in sizes:
+        df = generate_students_frame(size)
+        cohort = {'size': size, **figures.compute_aggregates(df, get_subjects())}
+        for name in selected:
+            limit, func = CASES[name]
+            if limit is not None and size > limit:
+                continue
+            case_repeat = repeat if size <= 100_000 else 1
+            seconds = time_call(func, cohort, repeat=case_repeat)
+            peak = peak_memory(func, cohort)
+            results.append({'case': name, 'size': size, 'seconds': seconds, 'peak_bytes': peak})
+            print(f"{name:<36} {size:>12,} {seconds:>10.4f}s {peak / 2**20:>10.1f} MiB", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance, min_seconds=0.005, min_bytes=2**20):
+    """Return the results that are slower (or use more memory) than the baseline
+
+    Baseline values below ``min_seconds``/``min_bytes`` are raised to those
+    floors first, so timer and allocator noise on tiny cases is not flagged.
+    """
+    previous = {(r['case'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['case'], result['size']))
+        if before is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            floor = min_seconds if metric == 'seconds' else min_bytes
+            if result[metric] > max(before[metric], floor) * (1 + tolerance):
+                regressions.append({**result, 'metric': metric, 'baseline': before[metric]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against a previous JSON result file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative slowdown before a case counts as a regression')
+    args = parser.parse_args()
+
+    selected = [name for name in CASES if args.filter in name]
+    print(f"{'case':<36} {'students':>12} {'time':>11} {'peak':>14}")
+    results = run(args.sizes, selected, args.repeat)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} @ {r['size']:,}: {r['metric']} {r['baseline']:.4g} -> {r[r['metric']]:.4g}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
 # Configuration settings for the student performance analysis application
+import os
 
 # Constants for subjects
-SUBJECTS = ["Mathematics", "Computer Science", "Statistics", "Data Structures", "Database Management"]
+SUBJECTS = ["Mathematics", "Computer Science", "Statistics", "Data Structures", "Algorithms"]
 
 # Number of students to generate
 NUM_STUDENTS = 100
@@ -9,17 +10,49 @@ NUM_STUDENTS = 100
 # Random seed for reproducibility
 RANDOM_SEED = 42
 
-# Grading scale
+# Bump when the generated data changes, so cached cohorts are not reused
+DATA_VERSION = 1
+
+# Grading scale: the lowest percentage of each grade (src/analysis/grading.py)
 GRADE_SCALE = {
-    "A": (90, 100),
-    "B": (80, 89),
-    "C": (70, 79),
-    "D": (60, 69),
-    "F": (0, 59)
+    "A+": 90,
+    "A": 80,
+    "B+": 70,
+    "B": 60,
+    "C": 50,
+    "F": 0
 }
 
-# Pass mark
+# Pass marks: overall percentage, and the score needed in every subject
 PASS_MARK = 40
+SUBJECT_PASS_MARK = 35
+
+# Per-institution overrides of the settings above ("grade_scale", "pass_mark",
+# "subject_pass_mark" or "subjects"), keyed by institution, e.g.
+# {"City College": {"pass_mark": 45, "subject_pass_mark": {"Mathematics": 40, ...}}}
+INSTITUTION_POLICIES = {}
 
 # File paths for data storage
-DATA_FILE_PATH = "src/data/students_data.py"
\ No newline at end of file
+# Cohort store directory (see src/data/cohort_store.py), relative to the repository root
+DATA_FILE_PATH = "data/cohort"
+
+# Dashboard cache (src/utils/cache.py): entries, memory cap and time-to-live
+CACHE_MAX_ENTRIES = 512
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+CACHE_TTL_SECONDS = 3600
+
+# Cohorts shared by every session (src/data/cohort_registry.py): resident
+# memory of the cohorts no session is viewing before they are evicted
+COHORT_REGISTRY_MAX_BYTES = 2 * 1024 * 1024 * 1024
+# Directory to spill cohorts to as memory-mapped cohort stores (unset to keep them in memory)
+COHORT_SPILL_DIR = os.environ.get("DASHBOARD_COHORT_DIR")
+
+# Most points a single chart sends to the browser (src/utils/charts.py)
+CHART_POINT_BUDGET = 20000
+
+# Render profiling (src/utils/profiling.py): off unless DASHBOARD_PROFILE=1
+PROFILING_ENABLED = os.environ.get("DASHBOARD_PROFILE") == "1"
+# Renders kept for the p50/p95 stage times
+PROFILING_HISTORY = 200
+# Prometheus text file rewritten after each profiled render (unset to disable)
+PROFILING_METRICS_FILE = os.environ.get("DASHBOARD_METRICS_FILE")
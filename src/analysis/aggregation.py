@@ -0,0 +1,169 @@
+"""Single-pass, mergeable aggregation of cohort statistics.
+
+``aggregate_cohort`` reduces a student DataFrame to a small partial aggregate:
+counts, percentage sums and extremes, and a score histogram per subject. The
+histogram is built with one ``np.bincount`` over the whole score matrix, and
+every per-subject statistic the dashboard shows (mean, median, std, min, max,
+pass rate) is derived from it. Partial aggregates of chunks merge exactly with
+``merge_aggregates``, so statistics for a chunked or growing cohort never need
+a rescan, and ``summarize`` turns a partial aggregate into the final stats.
+"""
+import numpy as np
+import pandas as pd
+
+from analysis.grading import get_policy
+
+MAX_SCORE = 100
+
+
+def _value_counts(series):
+    """Return {value: count} for a categorical or plain column, without zeros"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        counts = np.bincount(series.cat.codes.to_numpy() + 1, minlength=len(series.cat.categories) + 1)[1:]
+        return {label: int(count) for label, count in zip(series.cat.categories, counts) if count}
+    return {label: int(count) for label, count in series.value_counts().items()}
+
+
+def _merge_counts(a, b):
+    merged = dict(a)
+    for key, count in b.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def aggregate_cohort(df, subjects):
+    """Return the partial aggregate of a cohort (or chunk) DataFrame"""
+    scores = df[subjects].to_numpy()
+    percentage = df['percentage'].to_numpy(dtype=np.float64)
+    num_subjects = len(subjects)
+
+    # One sweep: bin every (subject, score) pair into a flat histogram
+    flat = scores.astype(np.int64) + np.arange(num_subjects) * (MAX_SCORE + 1)
+    subject_hist = np.bincount(flat.ravel(), minlength=num_subjects * (MAX_SCORE + 1))
+    subject_hist = subject_hist.reshape(num_subjects, MAX_SCORE + 1)
+
+    count = len(df)
+    agg = {
+        'subjects': list(subjects),
+        'count': count,
+        'subject_hist': subject_hist,
+        'total_hist': np.bincount(scores.sum(axis=1), minlength=num_subjects * MAX_SCORE + 1),
+        'percentage_sum': float(percentage.sum()),
+        'percentage_sumsq': float(np.dot(percentage, percentage)),
+        'above_80': int((percentage >= 80).sum()),
+        'below_50': int((percentage < 50).sum()),
+        'attendance_sum': float(df['attendance'].to_numpy(dtype=np.float64).sum()),
+        'grade_counts': _value_counts(df['grade']),
+        'status_counts': _value_counts(df['status']),
+        'highest': None,
+        'lowest': None,
+    }
+    if count:
+        best, worst = int(percentage.argmax()), int(percentage.argmin())
+        agg['highest'] = (round(float(percentage[best]), 2), df['name'].iloc[best])
+        agg['lowest'] = (round(float(percentage[worst]), 2), df['name'].iloc[worst])
+    return agg
+
+
+def merge_aggregates(a, b):
+    """Return the aggregate of two cohorts from their partial aggregates
+
+    ``a`` is treated as coming first, so ties for highest and lowest scorer
+    keep ``a``'s student, matching ``idxmax``/``idxmin`` on the combined frame.
+    """
+    if a['subjects'] != b['subjects']:
+        raise ValueError(f"cannot merge aggregates over {a['subjects']} and {b['subjects']}")
+    merged = {
+        'subjects': a['subjects'],
+        'count': a['count'] + b['count'],
+        'subject_hist': a['subject_hist'] + b['subject_hist'],
+        'total_hist': a['total_hist'] + b['total_hist'],
+        'grade_counts': _merge_counts(a['grade_counts'], b['grade_counts']),
+        'status_counts': _merge_counts(a['status_counts'], b['status_counts']),
+    }
+    for key in ('percentage_sum', 'percentage_sumsq', 'above_80', 'below_50', 'attendance_sum'):
+        merged[key] = a[key] + b[key]
+    candidates = [x for x in (a['highest'], b['highest']) if x is not None]
+    merged['highest'] = max(candidates, key=lambda x: x[0]) if candidates else None
+    candidates = [x for x in (a['lowest'], b['lowest']) if x is not None]
+    merged['lowest'] = min(candidates, key=lambda x: x[0]) if candidates else None
+    return merged
+
+
+def aggregate_chunks(chunks, subjects):
+    """Return the aggregate of an iterable of DataFrame chunks"""
+    total = None
+    for chunk in chunks:
+        partial = aggregate_cohort(chunk, subjects)
+        total = partial if total is None else merge_aggregates(total, partial)
+    return total
+
+
+def _histogram_median(hist, values):
+    """Return the median of the data described by counts ``hist`` over ``values``"""
+    n = hist.sum()
+    if n == 0:
+        return float('nan')
+    cumulative = np.cumsum(hist)
+    lower = values[np.searchsorted(cumulative, (n - 1) // 2 + 1)]
+    upper = values[np.searchsorted(cumulative, n // 2 + 1)]
+    return (lower + upper) / 2
+
+
+def _sample_std(n, total, total_sq):
+    if n < 2:
+        return float('nan')
+    variance = (total_sq - total * total / n) / (n - 1)
+    return float(np.sqrt(max(variance, 0.0)))
+
+
+def summarize(agg, policy=None):
+    """Return the dashboard statistics for a (possibly merged) aggregate
+
+    Subject pass rates use the subject pass marks of ``policy`` (the
+    configured grading policy by default).
+    """
+    n = agg['count']
+    subjects = agg['subjects']
+    pass_marks = (policy or get_policy()).subject_marks(subjects)
+    score_values = np.arange(MAX_SCORE + 1, dtype=np.float64)
+
+    subject_stats = {}
+    for subject, hist in zip(subjects, agg['subject_hist']):
+        total = float(hist @ score_values)
+        nonzero = np.flatnonzero(hist)
+        subject_stats[subject] = {
+            'mean': total / n if n else float('nan'),
+            'median': float(_histogram_median(hist, score_values)),
+            'std': _sample_std(n, total, float(hist @ score_values ** 2)),
+            'min': int(nonzero[0]) if len(nonzero) else None,
+            'max': int(nonzero[-1]) if len(nonzero) else None,
+            'pass_rate': float(hist[int(np.ceil(pass_marks[subject])):].sum() / n * 100) if n else float('nan'),
+        }
+
+    total_values = np.arange(len(agg['total_hist']), dtype=np.float64)
+    median_total = _histogram_median(agg['total_hist'], total_values)
+    percentage_stats = {
+        'mean': agg['percentage_sum'] / n if n else float('nan'),
+        'median': round(float(median_total) / len(subjects), 2),
+        'std': _sample_std(n, agg['percentage_sum'], agg['percentage_sumsq']),
+        'min': agg['lowest'][0] if n else float('nan'),
+        'max': agg['highest'][0] if n else float('nan'),
+    }
+
+    status_counts = agg['status_counts']
+    return {
+        'total_students': n,
+        'pass_rate': round(status_counts.get('Pass', 0) / n * 100, 2) if n else 0.0,
+        'average_percentage': round(percentage_stats['mean'], 2),
+        'highest_scorer': agg['highest'][1] if n else None,
+        'lowest_scorer': agg['lowest'][1] if n else None,
+        'subject_averages': {subject: round(stats['mean'], 2) for subject, stats in subject_stats.items()},
+        'grade_distribution': dict(sorted(agg['grade_counts'].items(), key=lambda item: -item[1])),
+        'status_distribution': dict(sorted(status_counts.items(), key=lambda item: -item[1])),
+        'percentage_stats': percentage_stats,
+        'subject_stats': subject_stats,
+        'students_above_80': agg['above_80'],
+        'students_below_50': agg['below_50'],
+        'average_attendance': agg['attendance_sum'] / n if n else float('nan'),
+    }
@@ -0,0 +1,91 @@
+"""Streaming, mergeable covariance of the subject score matrix.
+
+``CovarianceAccumulator`` keeps the count, the mean vector and the matrix of
+co-moments (sums of products of deviations from the mean) of the subject
+scores. Each batch of students is reduced with one centred matrix product and
+folded in with Chan et al.'s pairwise update, so accumulators built over
+chunks, in parallel, or as new students arrive merge exactly, and the
+correlation matrix, standard deviations and means cost O(subjects²) to read.
+"""
+import numpy as np
+import pandas as pd
+
+
+class CovarianceAccumulator:
+    """Count, means and co-moments of a set of numeric columns"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        """Return an accumulator over the ``columns`` of ``df``"""
+        accumulator = cls(columns)
+        accumulator.update(df)
+        return accumulator
+
+    @classmethod
+    def from_chunks(cls, chunks, columns):
+        """Return an accumulator over an iterable of DataFrame chunks"""
+        accumulator = cls(columns)
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return accumulator
+
+    def __len__(self):
+        return self.count
+
+    def update(self, data):
+        """Add a batch of students: a DataFrame or an (n, columns) array"""
+        if isinstance(data, pd.DataFrame):
+            data = data[self.columns].to_numpy(dtype=np.float64)
+        else:
+            data = np.asarray(data, dtype=np.float64).reshape(-1, len(self.columns))
+        n = len(data)
+        if n == 0:
+            return self
+        mean = data.mean(axis=0)
+        centred = data - mean
+        self._combine(n, mean, centred.T @ centred)
+        return self
+
+    def merge(self, other):
+        """Add the students of another accumulator over the same columns"""
+        if other.columns != self.columns:
+            raise ValueError(f"cannot merge covariance over {self.columns} and {other.columns}")
+        if other.count:
+            self._combine(other.count, other.mean, other.comoment)
+        return self
+
+    def _combine(self, n, mean, comoment):
+        total = self.count + n
+        delta = mean - self.mean
+        self.comoment = self.comoment + comoment + np.outer(delta, delta) * (self.count * n / total)
+        self.mean = self.mean + delta * (n / total)
+        self.count = total
+
+    def covariance(self, ddof=1):
+        """Return the covariance matrix (sample covariance by default)"""
+        dof = self.count - ddof
+        values = self.comoment / dof if dof > 0 else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
+
+    def std(self, ddof=1):
+        """Return the standard deviation of each column"""
+        return pd.Series(np.sqrt(np.diag(self.covariance(ddof).to_numpy())), index=self.columns)
+
+    def means(self):
+        """Return the mean of each column"""
+        return pd.Series(self.mean if self.count else np.nan, index=self.columns)
+
+    def correlation(self):
+        """Return the Pearson correlation matrix (NaN for constant columns)"""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = self.comoment / np.outer(scale, scale)
+        np.fill_diagonal(values, np.where(scale > 0, 1.0, np.nan))
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
@@ -0,0 +1,167 @@
+"""Pre-aggregated semester x grade x status x attendance-band cube.
+
+``PerformanceCube`` is materialized once per cohort. Each cell holds the
+student count and, per measure (every subject, percentage and attendance),
+the sum and sum of squares, plus per-subject pass counts. Group-bys such as
+mean percentage by semester, grade and status counts or per-subject pass
+rates, optionally filtered on any dimension, then cost O(cells) instead of
+O(students). Cubes of cohort chunks merge by addition.
+"""
+import numpy as np
+import pandas as pd
+
+from analysis.grading import STATUSES, get_policy
+
+SEMESTERS = [1, 2, 3, 4, 5, 6]
+# Lower bounds of the attendance bands after the first one
+ATTENDANCE_BAND_EDGES = [75, 85]
+
+
+def attendance_band_labels(edges=ATTENDANCE_BAND_EDGES):
+    """Return labels such as ['<75', '75-84', '85+'] for the band edges"""
+    labels = [f'<{edges[0]}']
+    labels += [f'{low}-{high - 1}' for low, high in zip(edges[:-1], edges[1:])]
+    labels.append(f'{edges[-1]}+')
+    return labels
+
+
+def default_dimensions(policy=None):
+    """Return the cube dimensions and their labels, in axis order"""
+    policy = policy or get_policy()
+    return {
+        'semester': SEMESTERS,
+        'grade': policy.grade_labels,
+        'status': STATUSES,
+        'attendance_band': attendance_band_labels(),
+    }
+
+
+def _codes(series, labels, dimension):
+    """Return the position of every value of ``series`` in ``labels``"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Map the few categories, then the codes
+        mapping = _codes(pd.Series(series.cat.categories), labels, dimension)
+        codes = series.cat.codes.to_numpy()
+        if (codes < 0).any():
+            raise ValueError(f"missing {dimension} values")
+        return mapping[codes]
+    values = pd.Index(series)
+    codes = pd.Index(labels).get_indexer(values)
+    if (codes < 0).any():
+        unknown = sorted(set(values[codes < 0].astype(str)))
+        raise ValueError(f"unknown {dimension} values: {unknown[:5]}")
+    return codes
+
+
+class PerformanceCube:
+    """Counts, sums and sums of squares per cell of the performance cube"""
+
+    def __init__(self, dimensions, measures, subjects, count, sums, sumsqs, passes):
+        self.dimensions = dimensions
+        self.measures = measures
+        self.subjects = subjects
+        self.count = count
+        self.sums = sums
+        self.sumsqs = sumsqs
+        self.passes = passes
+
+    @classmethod
+    def from_frame(cls, df, subjects, dimensions=None, policy=None):
+        """Materialize the cube of a cohort (or chunk) DataFrame in one pass per measure
+
+        Grades and subject pass marks are those of ``policy`` (the configured
+        grading policy by default).
+        """
+        policy = policy or get_policy()
+        dimensions = dimensions or default_dimensions(policy)
+        shape = tuple(len(labels) for labels in dimensions.values())
+        band = np.searchsorted(ATTENDANCE_BAND_EDGES, df['attendance'].to_numpy(), side='right')
+        codes = [
+            _codes(df['semester'], dimensions['semester'], 'semester'),
+            _codes(df['grade'], dimensions['grade'], 'grade'),
+            _codes(df['status'], dimensions['status'], 'status'),
+            band,
+        ]
+        cell = np.ravel_multi_index(codes, shape)
+        size = int(np.prod(shape))
+
+        measures = list(subjects) + ['percentage', 'attendance']
+        sums = np.empty(shape + (len(measures),))
+        sumsqs = np.empty(shape + (len(measures),))
+        for i, measure in enumerate(measures):
+            values = df[measure].to_numpy(dtype=np.float64)
+            sums[..., i] = np.bincount(cell, weights=values, minlength=size).reshape(shape)
+            sumsqs[..., i] = np.bincount(cell, weights=values * values, minlength=size).reshape(shape)
+        passes = np.empty(shape + (len(subjects),), dtype=np.int64)
+        pass_marks = policy.subject_marks(subjects)
+        for i, subject in enumerate(subjects):
+            passed = cell[df[subject].to_numpy() >= pass_marks[subject]]
+            passes[..., i] = np.bincount(passed, minlength=size).reshape(shape)
+        count = np.bincount(cell, minlength=size).reshape(shape)
+        return cls(dimensions, measures, list(subjects), count, sums, sumsqs, passes)
+
+    def merge(self, other):
+        """Return the cube of both cohorts combined"""
+        if other.dimensions != self.dimensions or other.measures != self.measures:
+            raise ValueError("cannot merge cubes with different dimensions or measures")
+        return PerformanceCube(
+            self.dimensions, self.measures, self.subjects,
+            self.count + other.count,
+            self.sums + other.sums,
+            self.sumsqs + other.sumsqs,
+            self.passes + other.passes,
+        )
+
+    def _select(self, array, filters):
+        """Return ``array`` restricted to the labels in ``filters`` on each dimension"""
+        index = []
+        for name, labels in self.dimensions.items():
+            keep = filters.get(name)
+            if keep is None:
+                index.append(np.arange(len(labels)))
+            else:
+                index.append(np.flatnonzero(pd.Index(labels).isin(list(keep))))
+        return array[np.ix_(*index)]
+
+    def _by(self, array, dimension, filters):
+        """Sum a filtered array over every dimension except ``dimension``"""
+        selected = self._select(array, filters)
+        axis = list(self.dimensions).index(dimension)
+        other_axes = tuple(i for i in range(len(self.dimensions)) if i != axis)
+        return selected.sum(axis=other_axes)
+
+    def _labels(self, dimension, filters):
+        labels = self.dimensions[dimension]
+        keep = filters.get(dimension)
+        return labels if keep is None else [label for label in labels if label in keep]
+
+    def counts(self, dimension, **filters):
+        """Return the number of students per label of ``dimension``"""
+        return pd.Series(self._by(self.count, dimension, filters), index=self._labels(dimension, filters))
+
+    def mean(self, dimension, measure='percentage', **filters):
+        """Return the mean of ``measure`` per label of ``dimension`` (NaN for empty groups)"""
+        i = self.measures.index(measure)
+        totals = self._by(self.sums[..., i], dimension, filters)
+        counts = self._by(self.count, dimension, filters)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.Series(totals / counts, index=self._labels(dimension, filters))
+
+    def std(self, dimension, measure='percentage', **filters):
+        """Return the sample standard deviation of ``measure`` per label of ``dimension``"""
+        i = self.measures.index(measure)
+        totals = self._by(self.sums[..., i], dimension, filters)
+        squares = self._by(self.sumsqs[..., i], dimension, filters)
+        n = self._by(self.count, dimension, filters)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (squares - totals * totals / n) / (n - 1)
+        return pd.Series(np.sqrt(np.maximum(variance, 0)), index=self._labels(dimension, filters))
+
+    def total_count(self, **filters):
+        return int(self._select(self.count, filters).sum())
+
+    def subject_pass_rates(self, **filters):
+        """Return the percentage of students passing each subject"""
+        n = self.total_count(**filters)
+        passes = self._select(self.passes, filters).reshape(-1, len(self.subjects)).sum(axis=0)
+        return pd.Series(passes / n * 100 if n else np.nan, index=self.subjects)
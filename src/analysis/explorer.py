@@ -0,0 +1,158 @@
+"""Server-side filtering, sorting and paging for the raw data view.
+
+A query over a cohort resolves to an array of row positions: categorical
+filters compare integer codes, percentage ranges are binary searches on the
+``RankIndex``, id/name searches go through the ``StudentIndex``, and sorting
+on an indexed column walks the pre-sorted order instead of re-sorting. Only
+the rows of the requested page are then materialized, and exports stream the
+filtered rows out in chunks.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def _isin(series, values):
+    """Return a boolean mask of ``series`` in ``values``, on codes for categoricals"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        wanted = series.cat.categories.get_indexer(list(values))
+        return np.isin(series.cat.codes.to_numpy(), wanted[wanted >= 0])
+    return series.isin(list(values)).to_numpy()
+
+
+def filter_positions(df, filters=None, percentage_range=None, keys=None,
+                     rank_index=None, student_index=None):
+    """Return the ascending row positions matching every given condition
+
+    ``filters`` maps columns to allowed values, ``percentage_range`` is an
+    inclusive (low, high) pair and ``keys`` are student ids or names. The
+    percentage range uses ``rank_index`` and the keys ``student_index`` when
+    they are given.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in (filters or {}).items():
+        if values:
+            mask &= _isin(df[column], values)
+    if percentage_range is not None:
+        low, high = percentage_range
+        if rank_index is not None and 'percentage' in rank_index.columns:
+            in_range = np.zeros(len(df), dtype=bool)
+            in_range[rank_index.between(low, high)] = True
+            mask &= in_range
+        else:
+            percentage = df['percentage'].to_numpy()
+            mask &= (percentage >= low) & (percentage <= high)
+    if keys:
+        if student_index is not None:
+            matched = student_index.lookup(keys)
+        else:
+            matched = np.flatnonzero(_isin(df['student_id'], keys) | _isin(df['name'], keys))
+        by_key = np.zeros(len(df), dtype=bool)
+        by_key[matched] = True
+        mask &= by_key
+    return np.flatnonzero(mask)
+
+
+def _category_ranks(categorical, order=None):
+    """Return the sort rank of each category of ``categorical``
+
+    Ordered categoricals rank by their codes, others by ``order`` (a list of
+    labels, lowest first) when given, else by value: codes follow the order
+    the categories were built in, which need not be alphabetical.
+    """
+    categories = categorical.categories
+    if categorical.ordered:
+        return np.arange(len(categories))
+    if order is not None:
+        ranks = pd.Index(order).get_indexer(categories)
+        return np.where(ranks >= 0, ranks, len(order))
+    return np.argsort(np.argsort(categories.to_numpy(), kind='stable'), kind='stable')
+
+
+def sort_positions(df, positions, column, ascending=True, rank_index=None, category_orders=None):
+    """Return ``positions`` ordered by ``column``
+
+    Columns held by ``rank_index`` reuse its sorted order, which costs one
+    pass over the cohort instead of a sort of the filtered rows.
+    ``category_orders`` maps unordered categorical columns to their labels in
+    sort order, e.g. the grades from lowest to highest.
+    """
+    if column is None:
+        return positions
+    if rank_index is not None and column in rank_index.columns:
+        selected = np.zeros(len(df), dtype=bool)
+        selected[positions] = True
+        order = rank_index.order[column]
+        ordered = order[selected[order]]
+        return ordered if ascending else ordered[::-1]
+    values = df[column].iloc[positions]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Sort on integer ranks of the categories; missing values go last
+        ranks = _category_ranks(values.array, (category_orders or {}).get(column))
+        codes = values.array.codes
+        keys = np.where(codes >= 0, ranks[codes], len(ranks))
+    else:
+        keys = values.to_numpy()
+    ordered = positions[np.argsort(keys, kind='stable')]
+    return ordered if ascending else ordered[::-1]
+
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
+
+
+def get_page(df, positions, page, page_size, columns=None):
+    """Return the rows of 1-based ``page``, optionally only ``columns``
+
+    Categorical columns come back as plain values. Sliced rows keep all of
+    the cohort's categories, so a page of ids would otherwise serialize (or
+    export) every id in the cohort along with it.
+    """
+    start = (page - 1) * page_size
+    rows = df.iloc[positions[start:start + page_size]]
+    if columns is not None:
+        rows = rows[list(columns)]
+    categorical = rows.select_dtypes('category').columns
+    return rows.assign(**{column: np.asarray(rows[column]) for column in categorical})
+
+
+def iter_export_chunks(df, positions, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the selected rows as DataFrames of at most ``chunk_rows`` rows"""
+    for start in range(0, len(positions), chunk_rows):
+        yield get_page(df, positions[start:start + chunk_rows], 1, chunk_rows, columns)
+
+
+def export_csv(df, positions, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Return the selected rows as CSV bytes, converted one chunk at a time"""
+    buffer = io.BytesIO()
+    for i, chunk in enumerate(iter_export_chunks(df, positions, columns, chunk_rows)):
+        buffer.write(chunk.to_csv(index=False, header=i == 0).encode())
+    if len(positions) == 0:
+        buffer.write(get_page(df, positions, 1, 0, columns).to_csv(index=False).encode())
+    return buffer.getvalue()
+
+
+def export_parquet(df, positions, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Return the selected rows as Parquet bytes, one row group per chunk
+
+    Requires pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    writer = None
+    for chunk in iter_export_chunks(df, positions, columns, chunk_rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(buffer, table.schema)
+        writer.write_table(table)
+    if writer is None:
+        empty = get_page(df, positions, 1, 0, columns)
+        pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), buffer)
+    else:
+        writer.close()
+    return buffer.getvalue()
@@ -0,0 +1,130 @@
+"""Grading scales and pass rules compiled to vectorized evaluation.
+
+A ``GradingPolicy`` is built from a grading scale (the lowest percentage of
+each grade) and pass rules (an overall pass mark and a pass mark per
+subject). Grades are assigned with one ``np.searchsorted`` over the grade
+boundaries and pass/fail with boolean masks over the score matrix, so a
+cohort of millions can be regraded under a new policy in one batch without
+regenerating its scores. ``get_policy`` reads the policy from ``config.py``,
+optionally with the overrides of one institution.
+"""
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_POLICY = 'default'
+STATUSES = ['Fail', 'Pass']
+
+
+def _as_percentage(percentage):
+    """Return percentages as float64 rounded to 2 decimals
+
+    Stored percentages may be float32, where e.g. 60.6 is 60.59999847; the
+    bounds are compared against the 2-decimal value the percentage stands for.
+    """
+    return np.round(np.asarray(percentage, dtype=np.float64), 2)
+
+
+class GradingPolicy:
+    """One grading scale plus pass rules"""
+
+    def __init__(self, grade_scale, pass_mark, subject_pass_mark, subjects, name=DEFAULT_POLICY):
+        """
+        ``grade_scale`` maps each grade to its lowest percentage; percentages
+        below every bound get the lowest grade. ``subject_pass_mark`` is one
+        mark for every subject or a {subject: mark} dict covering ``subjects``.
+        """
+        scale = sorted(grade_scale.items(), key=lambda item: item[1])
+        bounds = [low for _, low in scale]
+        if not scale:
+            raise ValueError("the grading scale needs at least one grade")
+        if len(set(bounds)) != len(bounds):
+            raise ValueError(f"grades share a lower bound: {grade_scale}")
+        if isinstance(subject_pass_mark, dict):
+            missing = [subject for subject in subjects if subject not in subject_pass_mark]
+            if missing:
+                raise ValueError(f"no pass mark for {missing}")
+            marks = [subject_pass_mark[subject] for subject in subjects]
+        else:
+            marks = [subject_pass_mark] * len(subjects)
+
+        self.name = name
+        self.subjects = list(subjects)
+        self.pass_mark = pass_mark
+        self.subject_pass_marks = dict(zip(self.subjects, marks))
+        # Ascending, lowest grade first; the lowest bound needs no edge
+        self.grade_labels = [label for label, _ in scale]
+        self.grade_bounds = np.array(bounds[1:], dtype=np.float64)
+        self._bounds = bounds[1:]
+        self._marks = np.array(marks, dtype=np.float64)
+
+    def grade_codes(self, percentage):
+        """Return the position of each percentage's grade in ``grade_labels``"""
+        return np.searchsorted(self.grade_bounds, _as_percentage(percentage), side='right')
+
+    def grades(self, percentage):
+        """Return the grade of each percentage as a Categorical"""
+        return pd.Categorical.from_codes(self.grade_codes(percentage), self.grade_labels)
+
+    def passed(self, scores, percentage):
+        """Return a boolean mask: every subject and the overall percentage pass
+
+        ``scores`` is an (students, subjects) matrix in ``subjects`` order.
+        """
+        scores = np.asarray(scores)
+        return (scores >= self._marks).all(axis=-1) & (_as_percentage(percentage) >= self.pass_mark)
+
+    def statuses(self, scores, percentage):
+        """Return 'Pass'/'Fail' for each student as a Categorical"""
+        passed = self.passed(scores, percentage)
+        return pd.Categorical.from_codes(passed.astype(np.int8), STATUSES)
+
+    def grade_of(self, percentage):
+        """Return the grade of one percentage"""
+        return self.grade_labels[bisect_right(self._bounds, round(float(percentage), 2))]
+
+    def status_of(self, scores, percentage):
+        """Return 'Pass' or 'Fail' for one student's scores and percentage"""
+        passed = round(float(percentage), 2) >= self.pass_mark and all(
+            score >= mark for score, mark in zip(scores, self._marks)
+        )
+        return STATUSES[passed]
+
+    def subject_marks(self, subjects=None):
+        """Return the pass mark of each subject as a Series"""
+        subjects = self.subjects if subjects is None else list(subjects)
+        return pd.Series([self.subject_pass_marks[subject] for subject in subjects], index=subjects)
+
+    def regrade(self, df):
+        """Return ``df`` with ``grade`` and ``status`` recomputed under this policy
+
+        Only the subject scores and percentage are read; nothing else changes.
+        """
+        percentage = df['percentage'].to_numpy()
+        scores = df[self.subjects].to_numpy()
+        return df.assign(grade=self.grades(percentage), status=self.statuses(scores, percentage))
+
+
+def get_policy(institution=None):
+    """Return the grading policy of ``config.py``, with an institution's overrides
+
+    ``config.INSTITUTION_POLICIES[institution]`` may override any of
+    ``grade_scale``, ``pass_mark``, ``subject_pass_mark`` and ``subjects``.
+    """
+    import config
+    settings = {
+        'grade_scale': config.GRADE_SCALE,
+        'pass_mark': config.PASS_MARK,
+        'subject_pass_mark': config.SUBJECT_PASS_MARK,
+        'subjects': config.SUBJECTS,
+    }
+    if institution not in (None, DEFAULT_POLICY):
+        overrides = config.INSTITUTION_POLICIES.get(institution)
+        if overrides is None:
+            raise KeyError(f"no grading policy for institution {institution!r}")
+        unknown = set(overrides) - set(settings)
+        if unknown:
+            raise ValueError(f"unknown grading settings for {institution!r}: {sorted(unknown)}")
+        settings.update(overrides)
+    return GradingPolicy(name=institution or DEFAULT_POLICY, **settings)
@@ -1,33 +1,102 @@
+"""Per-student and per-subject performance analytics.
+
+Every function accepts a cohort DataFrame (as produced by ``get_dataframe``),
+a 2-D score matrix (students x subjects) or the original list of
+``{'name': ..., 'scores': [...]}`` dicts, and works on a score matrix with
+vectorized row/column reductions. ``to_score_matrix`` does the conversion.
+"""
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+
+def to_score_matrix(students, subjects=None):
+    """Return (names, scores, subject_labels) for any supported cohort input
+
+    ``scores`` is a float64 matrix with one row per student. Lists of dicts
+    whose ``scores`` lists differ in length are padded with NaN, which the
+    reductions below ignore.
+    """
+    if isinstance(students, pd.DataFrame):
+        if subjects is None:
+            from data.students_data import get_subjects
+            subjects = get_subjects()
+        subjects = list(subjects)
+        return students['name'].to_numpy(), students[subjects].to_numpy(dtype=np.float64), subjects
+
+    if isinstance(students, np.ndarray):
+        if students.ndim != 2:
+            raise ValueError(f"expected a 2-D score matrix, got shape {students.shape}")
+        labels = list(subjects) if subjects is not None else [f'Subject {i + 1}' for i in range(students.shape[1])]
+        return np.arange(len(students)), students.astype(np.float64, copy=False), labels
+
+    names = [student['name'] for student in students]
+    score_lists = [student['scores'] for student in students]
+    lengths = np.fromiter(map(len, score_lists), dtype=np.int64, count=len(score_lists))
+    width = int(lengths.max()) if len(lengths) else 0
+    flat = np.fromiter(chain.from_iterable(score_lists), dtype=np.float64, count=int(lengths.sum()))
+    if len(lengths) and (lengths == width).all():
+        scores = flat.reshape(len(score_lists), width)
+    else:
+        scores = np.full((len(score_lists), width), np.nan)
+        scores[np.arange(width) < lengths[:, None]] = flat
+    labels = list(subjects) if subjects is not None else [f'Subject {i + 1}' for i in range(width)]
+    return names, scores, labels
+
+
+def _mean(scores, axis):
+    if np.isnan(scores).any():
+        return np.nanmean(scores, axis=axis)
+    return scores.mean(axis=axis)
+
+
+def student_averages(scores):
+    """Return the average score of every row of a score matrix"""
+    return _mean(scores, axis=1)
+
+
+def top_k_indices(values, k, largest=True):
+    """Return the indices of the ``k`` largest (or smallest) values, best first
+
+    Uses ``np.argpartition``, so the cost is O(n + k log k) instead of a full
+    O(n log n) sort (plus any values tied with the k-th one). Ties keep the
+    order of first appearance.
+    """
+    # float64 first: negating unsigned scores (e.g. uint8 marks) would wrap around
+    values = np.asarray(values, dtype=np.float64)
+    k = min(k, len(values))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    keys = -values if largest else values
+    candidates = np.arange(len(values))
+    if k < len(values):
+        # Every value tied with the k-th one is a candidate, so the lexsort
+        # below (not argpartition) decides which ties make the cut
+        kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+        if not np.isnan(kth):
+            candidates = np.flatnonzero(keys <= kth)
+    return candidates[np.lexsort((candidates, keys[candidates]))][:k]
+
+
 def calculate_average_performance(students):
-    averages = {}
-    for student in students:
-        averages[student['name']] = sum(student['scores']) / len(student['scores'])
-    return averages
+    names, scores, _ = to_score_matrix(students)
+    return dict(zip(names, student_averages(scores).tolist()))
+
 
 def calculate_pass_rate(students, passing_score=40):
-    pass_rate = {}
-    for student in students:
-        pass_count = sum(score >= passing_score for score in student['scores'])
-        pass_rate[student['name']] = pass_count / len(student['scores']) * 100
-    return pass_rate
+    names, scores, _ = to_score_matrix(students)
+    taken = (~np.isnan(scores)).sum(axis=1)
+    passed = (scores >= passing_score).sum(axis=1)
+    return dict(zip(names, (passed / taken * 100).tolist()))
+
 
 def get_subject_wise_average(students):
-    subject_totals = {}
-    subject_counts = {}
-    
-    for student in students:
-        for i, score in enumerate(student['scores']):
-            subject = f'Subject {i + 1}'
-            if subject not in subject_totals:
-                subject_totals[subject] = 0
-                subject_counts[subject] = 0
-            subject_totals[subject] += score
-            subject_counts[subject] += 1
-            
-    subject_averages = {subject: total / count for subject, (total, count) in zip(subject_totals.keys(), zip(subject_totals.values(), subject_counts.values()))}
-    return subject_averages
+    _, scores, labels = to_score_matrix(students)
+    return dict(zip(labels, _mean(scores, axis=0).tolist()))
+
 
 def get_top_performers(students, top_n=3):
-    averages = calculate_average_performance(students)
-    top_performers = sorted(averages.items(), key=lambda x: x[1], reverse=True)[:top_n]
-    return top_performers
\ No newline at end of file
+    names, scores, _ = to_score_matrix(students)
+    averages = student_averages(scores)
+    return [(names[i], float(averages[i])) for i in top_k_indices(averages, top_n)]
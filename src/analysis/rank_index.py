@@ -0,0 +1,106 @@
+"""Sorted rank index for top-N, percentile and range queries.
+
+``RankIndex`` sorts each ranked column (percentage and every subject) once
+per cohort. Afterwards top-k/bottom-k queries cost O(k), and percentile,
+rank and "between X and Y" queries are binary searches, instead of a
+``nlargest``/``idxmax``/full sort over the cohort on every render. Appending
+students merges the new rows into the sorted arrays without re-sorting.
+"""
+import numpy as np
+
+
+class RankIndex:
+    """Ascending sorted order of one or more numeric columns of a cohort"""
+
+    def __init__(self, df, columns):
+        self.columns = list(columns)
+        self.size = len(df)
+        self.sorted_values = {}
+        self.order = {}
+        for column in self.columns:
+            values = df[column].to_numpy()
+            # Stable, so equal values keep row order
+            order = np.argsort(values, kind='stable')
+            self.order[column] = order
+            self.sorted_values[column] = values[order]
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """Bytes held by the sorted values and orders"""
+        return sum(self.order[column].nbytes + self.sorted_values[column].nbytes for column in self.columns)
+
+    def top_k(self, k, column='percentage'):
+        """Return the row positions of the ``k`` highest values, best first
+
+        Ties are broken by row, first row first, as ``DataFrame.nlargest``
+        does. Only the top ``k`` and the rows tied with the k-th are sorted.
+        """
+        k = max(0, min(k, self.size))
+        if k == 0:
+            return self.order[column][:0]
+        values = self.sorted_values[column]
+        start = np.searchsorted(values, values[self.size - k], side='left')
+        candidates = self.order[column][start:]
+        best = np.lexsort((candidates, -values[start:].astype(np.float64)))
+        return candidates[best[:k]]
+
+    def bottom_k(self, k, column='percentage'):
+        """Return the row positions of the ``k`` lowest values, worst first"""
+        k = max(0, min(k, self.size))
+        return self.order[column][:k]
+
+    def between(self, low, high, column='percentage'):
+        """Return the row positions with ``low <= value <= high``, ascending by value"""
+        values = self.sorted_values[column]
+        start = np.searchsorted(values, low, side='left')
+        stop = np.searchsorted(values, high, side='right')
+        return self.order[column][start:stop]
+
+    def count_between(self, low, high, column='percentage'):
+        """Return how many students have ``low <= value <= high``"""
+        values = self.sorted_values[column]
+        return int(np.searchsorted(values, high, side='right') - np.searchsorted(values, low, side='left'))
+
+    def percentile_of(self, value, column='percentage'):
+        """Return the percentage of students scoring at or below ``value``"""
+        if self.size == 0:
+            return float('nan')
+        below = np.searchsorted(self.sorted_values[column], value, side='right')
+        return below / self.size * 100
+
+    def rank_of(self, value, column='percentage'):
+        """Return the 1-based rank of ``value``: one more than the number of higher values
+
+        ``value`` may be an array, e.g. the percentages of selected students.
+        """
+        higher = self.size - np.searchsorted(self.sorted_values[column], value, side='right')
+        return higher + 1
+
+    def value_at_percentile(self, percentile, column='percentage'):
+        """Return the lowest value at or above the given percentile"""
+        if self.size == 0:
+            return float('nan')
+        position = min(int(np.ceil(percentile / 100 * self.size)) - 1, self.size - 1)
+        return self.sorted_values[column][max(position, 0)]
+
+    def append(self, df):
+        """Add the students of ``df`` as rows ``len(self)`` onwards
+
+        Only the new rows are sorted; they are then merged into the existing
+        sorted arrays, which costs O(n + m log m) instead of a full re-sort.
+        """
+        added = len(df)
+        if added == 0:
+            return
+        for column in self.columns:
+            values = df[column].to_numpy()
+            new_order = np.argsort(values, kind='stable')
+            new_values = values[new_order]
+            # side='right' keeps existing (earlier) rows ahead of new equal values
+            insert_at = np.searchsorted(self.sorted_values[column], new_values, side='right')
+            self.sorted_values[column] = np.insert(self.sorted_values[column], insert_at, new_values)
+            self.order[column] = np.insert(self.order[column], insert_at, new_order + self.size)
+        self.size += added
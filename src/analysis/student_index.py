@@ -0,0 +1,79 @@
+"""Indexed student lookup for a cohort DataFrame.
+
+``StudentIndex`` is built once per cohort and answers "which rows are these
+students" without scanning the frame: hash indexes on ``student_id`` (unique)
+and ``name`` (not unique once ``Student_N`` fill-ins appear), a cached score
+matrix for slicing subject scores, and a ``RankIndex`` on percentage. It
+returns row positions and keeps no reference to the frame, so a cached index
+does not keep an evicted cohort alive, and ``nbytes`` covers all it holds.
+"""
+import numpy as np
+import pandas as pd
+
+from analysis.rank_index import RankIndex
+
+
+class StudentIndex:
+    """Hash and rank indexes over one cohort DataFrame"""
+
+    def __init__(self, df, subjects, rank_index=None):
+        self.size = len(df)
+        self.subjects = list(subjects)
+        # Plain object indexes (not over the frame's Arrow strings); pandas
+        # builds the hash tables on first lookup and keeps them
+        self._ids = pd.Index(np.asarray(df['student_id'], dtype=object))
+        self._names = pd.Index(np.asarray(df['name'], dtype=object))
+        self.scores = df[self.subjects].to_numpy(copy=True)
+        self.percentage = df['percentage'].to_numpy(copy=True)
+        self.rank_index = rank_index if rank_index is not None else RankIndex(df, ['percentage'])
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """Bytes held by the indexes and arrays, not counting a shared ``rank_index``"""
+        return int(
+            self._ids.memory_usage(deep=True) + self._names.memory_usage(deep=True)
+            + self.scores.nbytes + self.percentage.nbytes
+        )
+
+    def names(self, positions):
+        """Return the names of the rows at ``positions``"""
+        return self._names[positions].tolist()
+
+    def lookup_ids(self, student_ids):
+        """Return the row positions of ``student_ids``, skipping unknown ids"""
+        positions = self._ids.get_indexer(list(student_ids))
+        return positions[positions >= 0]
+
+    def lookup_names(self, names):
+        """Return the row positions of every student called one of ``names``"""
+        positions, _ = self._names.get_indexer_non_unique(list(names))
+        positions = positions[positions >= 0]
+        return np.sort(positions)
+
+    def lookup(self, keys):
+        """Return row positions for a mix of student ids and names
+
+        Each key is tried as a student id first and as a name otherwise. Id
+        matches come first, then name matches, without duplicates.
+        """
+        keys = list(keys)
+        by_id = self._ids.get_indexer(keys)
+        names = [key for key, position in zip(keys, by_id) if position < 0]
+        positions = by_id[by_id >= 0]
+        if names:
+            # Matches come back grouped by name, in the order of ``names``
+            by_name, _ = self._names.get_indexer_non_unique(names)
+            positions = np.concatenate([positions, by_name[by_name >= 0]])
+        _, first = np.unique(positions, return_index=True)
+        return positions[np.sort(first)]
+
+    def score_rows(self, positions):
+        """Return the subject scores of the rows at ``positions`` as a matrix"""
+        return self.scores[positions]
+
+    def rank_of(self, positions):
+        """Return the 1-based percentage rank of the rows at ``positions``"""
+        return self.rank_index.rank_of(self.percentage[positions])
@@ -1,17 +1,56 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
+import importlib.util
 import sys
 import os
 
-# Add the src directory to the Python path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Add the src directory and the repository root to the Python path
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+sys.path.append(SRC_DIR)
+sys.path.append(ROOT_DIR)
+
+import config
 
 # Import from data module
-from data.students_data import get_dataframe, get_subjects, get_summary_stats
+from data.students_data import get_dataframe, get_summary_stats
+from data.cohort_store import MANIFEST_NAME, open_cohort_store
+from data.cohort_registry import CohortRegistry
+from analysis.covariance import CovarianceAccumulator
+from analysis.explorer import (
+    export_csv,
+    export_parquet,
+    filter_positions,
+    get_page,
+    page_count,
+    sort_positions,
+)
+from analysis.cube import PerformanceCube, attendance_band_labels, SEMESTERS, STATUSES
+from analysis.grading import DEFAULT_POLICY, get_policy
+from analysis.rank_index import RankIndex
+from analysis.student_index import StudentIndex
+from utils.cache import LRUCache
+from utils.profiling import NullProfiler, ProfileHistory, RenderProfiler, figure_payload_bytes, log_to_stderr
+from utils.figures import (
+    build_attendance_scatter,
+    build_correlation_heatmap,
+    build_difficulty_bar,
+    build_grade_pie,
+    build_grade_violin,
+    build_percentage_histogram,
+    build_radar,
+    build_semester_line,
+    build_status_bar,
+    build_subject_average_bar,
+    build_subject_box,
+)
+
+# Cohorts larger than this get a text box instead of a student multiselect
+MAX_SELECTOR_OPTIONS = 5000
+
+# Rows per page in the data explorer and the comparison table
+PAGE_SIZES = [25, 50, 100, 500]
 
 # Configure page
 st.set_page_config(
@@ -20,299 +59,517 @@ st.set_page_config(
     layout="wide"
 )
 
-def main():
-    st.title("🎓 Academic Performance Analysis")
-    st.markdown("---")
+@st.cache_resource
+def get_dashboard_cache():
+    """Return the cache shared by every session of this server process"""
+    return LRUCache(
+        max_entries=config.CACHE_MAX_ENTRIES,
+        max_bytes=config.CACHE_MAX_BYTES,
+        ttl=config.CACHE_TTL_SECONDS
+    )
+
+@st.cache_resource
+def get_cohort_registry():
+    """Return the cohorts shared by every session of this server process"""
+    return CohortRegistry(max_bytes=config.COHORT_REGISTRY_MAX_BYTES, spill_dir=config.COHORT_SPILL_DIR)
+
+@st.cache_resource
+def get_profile_history():
+    """Return the render profiles of this server process"""
+    log_to_stderr()
+    return ProfileHistory(config.PROFILING_HISTORY, config.PROFILING_METRICS_FILE)
+
+def load_cohort(cohort_key):
+    """Load the cohort described by a cohort key"""
+    if cohort_key[0] == 'store':
+        _, store_path, _, start, stop, _ = cohort_key
+        return open_cohort_store(store_path).read(start=start, stop=stop).reset_index(drop=True)
+    _, num_students, random_state, _ = cohort_key
+    return get_dataframe(num_students, random_state=random_state)
+
+def get_session_cohort(cohort_key, load):
+    """Return the shared cohort of ``cohort_key`` and hold it for this session
+
+    The session's lease on its previous cohort is released, and the lease is
+    released when the session's state is dropped, so the registry knows which
+    cohorts are still being viewed.
+    """
+    lease = st.session_state.get("cohort_lease")
+    if lease is None or lease.key != cohort_key or not lease.active:
+        previous = lease
+        # Stored cohorts are memory-mapped already; spilling them again only costs disk
+        lease = get_cohort_registry().lease(cohort_key, load, cohort_key, spill=cohort_key[0] != 'store')
+        st.session_state["cohort_lease"] = lease
+        if previous is not None:
+            previous.release()
+    return lease.frame
+
+def cached_figure(ctx, name, builder, *args, inputs=()):
+    """Return figure ``name`` for the cohort of ``ctx``, building it only on a cache miss
+
+    ``inputs`` holds any widget values the figure depends on besides the cohort.
+    The figure is cached as ``[fig, payload bytes]``; the payload is measured
+    once, on the first profiled render, so cache hits are never serialized.
+    """
+    profiler = ctx['profiler']
+    timed_builder = profiler.wrap(f'build.{name}', builder)
+
+    def build(*args):
+        fig = timed_builder(*args)
+        return [fig, figure_payload_bytes(fig) if profiler.enabled else None]
+
+    entry = ctx['cache'].get_or_compute(('figure', name, ctx['cohort_key'], inputs), build, *args)
+    if profiler.enabled:
+        if entry[1] is None:
+            entry[1] = figure_payload_bytes(entry[0])
+        profiler.record_payload(name, entry[1])
+    return entry[0]
+
+def show_profile(record, history):
+    """Render the profiling panel for the last render in the sidebar"""
+    with st.sidebar.expander("🛠️ Profiling", expanded=True):
+        st.caption(f"Render: {record['total_seconds'] * 1000:.0f} ms")
+        quantiles = history.quantiles()
+        timings = pd.DataFrame(
+            [
+                (name, seconds * 1000, quantiles[name][0.5] * 1000, quantiles[name][0.95] * 1000)
+                for name, seconds in record['seconds'].items()
+            ],
+            columns=['Stage', 'Last (ms)', 'p50 (ms)', 'p95 (ms)']
+        ).sort_values('Last (ms)', ascending=False)
+        st.dataframe(timings.round(1), hide_index=True, use_container_width=True)
+        if record['payload_bytes']:
+            payloads = pd.Series(record['payload_bytes'], name='Payload (KiB)') / 1024
+            st.dataframe(payloads.sort_values(ascending=False).round(1), use_container_width=True)
+        if record['peak_rss_bytes'] is not None:
+            st.caption(f"Peak RSS: {record['peak_rss_bytes'] / 2**20:.0f} MiB")
+
+def get_rank_index(ctx):
+    """Return the rank index of the cohort, building it on first use"""
+    return ctx['cache'].get_or_compute(
+        ('rank_index', ctx['cohort_key']), ctx['profiler'].wrap('rank_index', RankIndex),
+        ctx['df'], ['percentage'] + ctx['subjects']
+    )
+
+def get_covariance(ctx):
+    """Return the subject covariance accumulator of the cohort, building it on first use"""
+    return ctx['cache'].get_or_compute(
+        ('covariance', ctx['cohort_key']), ctx['profiler'].wrap('covariance', CovarianceAccumulator.from_frame),
+        ctx['df'], ctx['subjects']
+    )
+
+def get_student_index(ctx):
+    """Return the student lookup index of the cohort, building it on first use"""
+    return ctx['cache'].get_or_compute(
+        ('student_index', ctx['cohort_key']), ctx['profiler'].wrap('student_index', StudentIndex),
+        ctx['df'], ctx['subjects'], get_rank_index(ctx)
+    )
+
+def query_positions(ctx, query):
+    """Return the filtered, sorted row positions for an explorer query"""
+    df = ctx['df']
+    rank_index = get_rank_index(ctx)
+    student_index = get_student_index(ctx) if query['keys'] else None
+    positions = filter_positions(
+        df, dict(query['filters']), query['percentage_range'], query['keys'],
+        rank_index=rank_index, student_index=student_index
+    )
+    category_orders = {'grade': ctx['policy'].grade_labels, 'status': STATUSES}
+    return sort_positions(df, positions, query['sort_by'], query['ascending'], rank_index, category_orders)
+
+def show_paginated(df, positions, columns=None, key="page"):
+    """Show one page of the rows at ``positions``; only that page is sent to the browser"""
+    total = len(positions)
+    page_size = PAGE_SIZES[1]
+    page = 1
+    if total > PAGE_SIZES[0]:
+        col1, col2 = st.columns(2)
+        page_size = col1.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+        pages = page_count(total, page_size)
+        # A narrower filter can leave the remembered page past the end
+        if st.session_state.get(f"{key}_number", 1) > pages:
+            st.session_state[f"{key}_number"] = 1
+        page = col2.number_input("Page", 1, pages, 1, key=f"{key}_number")
+    start = (page - 1) * page_size
+    st.dataframe(get_page(df, positions, page, page_size, columns), use_container_width=True)
+    st.caption(f"Rows {min(start + 1, total):,}–{min(start + page_size, total):,} of {total:,}")
+
+def render_data_explorer(ctx):
+    """Filter, sort and export the cohort server-side"""
+    df = ctx['df']
+    with st.expander("Filters, sorting and columns"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            grades = st.multiselect("Grade", ctx['policy'].grade_labels, key="explorer_grade")
+            statuses = st.multiselect("Status", STATUSES, key="explorer_status")
+        with col2:
+            semesters = st.multiselect("Semester", SEMESTERS, key="explorer_semester")
+            percentage_range = st.slider("Percentage", 0.0, 100.0, (0.0, 100.0), 0.5, key="explorer_percentage")
+        with col3:
+            search = st.text_input("Student IDs or Names (comma-separated)", key="explorer_search")
+            sort_by = st.selectbox("Sort by", [None] + list(df.columns), key="explorer_sort")
+            ascending = st.toggle("Ascending", True, key="explorer_ascending")
+        columns = st.multiselect("Columns", list(df.columns), default=list(df.columns), key="explorer_columns")
     
-    # Sidebar for controls
-    st.sidebar.header("📋 Analysis Controls")
-    num_students = st.sidebar.slider("Number of Students", 20, 100, 50)
+    query = {
+        'filters': (('grade', tuple(grades)), ('status', tuple(statuses)), ('semester', tuple(semesters))),
+        'percentage_range': None if percentage_range == (0.0, 100.0) else percentage_range,
+        'keys': tuple(key.strip() for key in search.split(",") if key.strip()),
+        'sort_by': sort_by,
+        'ascending': ascending,
+    }
+    positions = ctx['cache'].get_or_compute(
+        ('explorer', ctx['cohort_key'], tuple(query.items())),
+        ctx['profiler'].wrap('explorer_query', query_positions), ctx, query
+    )
+    columns = columns or list(df.columns)
+    show_paginated(df, positions, columns, key="explorer_page")
     
-    # Generate data
-    df = get_dataframe(num_students)
-    subjects = get_subjects()
-    stats = get_summary_stats(df)
+    # Exports are generated only when the button is clicked
+    col1, col2 = st.columns(2)
+    col1.download_button(
+        "⬇️ Export CSV", lambda: export_csv(df, positions, columns),
+        file_name="students.csv", mime="text/csv", key="explorer_csv"
+    )
+    if importlib.util.find_spec("pyarrow") is not None:
+        col2.download_button(
+            "⬇️ Export Parquet", lambda: export_parquet(df, positions, columns),
+            file_name="students.parquet", mime="application/vnd.apache.parquet", key="explorer_parquet"
+        )
+
+# Analysis sections; only the selected one is computed and rendered
+def render_distribution(ctx):
+    df, stats, cube = ctx['df'], ctx['stats'], ctx['cube']
+    filters, filter_inputs = ctx['filters'], ctx['filter_inputs']
+    col1, col2 = st.columns(2)
     
-    # Display summary metrics
-    st.header("📈 Key Performance Metrics")
-    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        # Grade distribution pie chart
+        st.subheader("Grade Distribution")
+        fig_pie = cached_figure(
+            ctx, 'grade_pie', build_grade_pie,
+            cube.counts('grade', **filters), inputs=filter_inputs
+        )
+        st.plotly_chart(fig_pie, use_container_width=True)
+    
+    with col2:
+        # Pass/Fail status
+        st.subheader("Pass/Fail Status")
+        fig_status = cached_figure(
+            ctx, 'status_bar', build_status_bar,
+            cube.counts('status', **filters), inputs=filter_inputs
+        )
+        st.plotly_chart(fig_status, use_container_width=True)
+    
+    # Percentage distribution histogram
+    st.subheader("Percentage Score Distribution")
+    fig_hist = cached_figure(ctx, 'percentage_histogram', build_percentage_histogram, df, stats)
+    st.plotly_chart(fig_hist, use_container_width=True)
+
+def render_comparative(ctx):
+    df, stats, subjects = ctx['df'], ctx['stats'], ctx['subjects']
+    # Subject-wise performance comparison
+    st.subheader("Subject-wise Performance Comparison")
+    
+    col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("Total Students", stats['total_students'])
+        # Box plot for subject scores
+        fig_box = cached_figure(ctx, 'subject_box', build_subject_box, df, subjects)
+        st.plotly_chart(fig_box, use_container_width=True)
+    
     with col2:
-        st.metric("Pass Rate", f"{stats['pass_rate']}%")
-    with col3:
-        st.metric("Average Percentage", f"{stats['average_percentage']}%")
-    with col4:
-        st.metric("Top Performer", stats['highest_scorer'])
+        # Average scores by subject
+        fig_bar = cached_figure(ctx, 'subject_average_bar', build_subject_average_bar, stats)
+        st.plotly_chart(fig_bar, use_container_width=True)
     
-    # Data overview
-    st.header("📋 Student Data Overview")
-    if st.checkbox("Show Raw Data"):
-        st.dataframe(df, use_container_width=True)
+    # Correlation heatmap
+    st.subheader("Subject Correlation Analysis")
+    fig_heatmap = cached_figure(
+        ctx, 'correlation_heatmap', build_correlation_heatmap, get_covariance(ctx).correlation()
+    )
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+
+def render_individual(ctx):
+    df, subjects = ctx['df'], ctx['subjects']
+    # Individual student performance
+    st.subheader("Individual Student Performance Analysis")
     
-    # Charts section
-    st.header("📊 Performance Analysis Charts")
+    # Student selector: ids are unique, names are not past 56 students
+    student_index = get_student_index(ctx)
+    if len(df) <= MAX_SELECTOR_OPTIONS:
+        names_by_id = ctx['cache'].get_or_compute(
+            ('names_by_id', ctx['cohort_key']), lambda: dict(zip(df['student_id'], df['name']))
+        )
+        selected_students = st.multiselect(
+            "Select Students to Compare",
+            df['student_id'].tolist(),
+            default=df['student_id'].head(5).tolist(),
+            format_func=lambda student_id: f"{names_by_id[student_id]} ({student_id})"
+        )
+    else:
+        query = st.text_input(
+            "Student IDs or Names to Compare (comma-separated)",
+            value=", ".join(df['student_id'].head(5).tolist())
+        )
+        selected_students = [key.strip() for key in query.split(",") if key.strip()]
     
-    # Create tabs for different chart categories
-    tab1, tab2, tab3, tab4 = st.tabs(["📈 Distribution Analysis", "📊 Comparative Analysis", "🎯 Individual Performance", "📉 Statistical Analysis"])
+    positions = student_index.lookup(selected_students) if selected_students else []
+    if len(positions):
+        # Radar chart for selected students
+        fig_radar = cached_figure(
+            ctx, 'radar', build_radar,
+            student_index.names(positions),
+            student_index.score_rows(positions), subjects,
+            inputs=tuple(selected_students)
+        )
+        st.plotly_chart(fig_radar, use_container_width=True)
     
-    with tab1:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Grade distribution pie chart
-            st.subheader("Grade Distribution")
-            grade_counts = df['grade'].value_counts()
-            fig_pie = px.pie(
-                values=grade_counts.values,
-                names=grade_counts.index,
-                title="Student Grade Distribution",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
-        
-        with col2:
-            # Pass/Fail status
-            st.subheader("Pass/Fail Status")
-            status_counts = df['status'].value_counts()
-            fig_status = px.bar(
-                x=status_counts.index,
-                y=status_counts.values,
-                title="Pass/Fail Distribution",
-                color=status_counts.index,
-                color_discrete_map={'Pass': 'green', 'Fail': 'red'}
-            )
-            st.plotly_chart(fig_status, use_container_width=True)
-        
-        # Percentage distribution histogram
-        st.subheader("Percentage Score Distribution")
-        fig_hist = px.histogram(
-            df, 
-            x='percentage', 
-            nbins=20, 
-            title="Distribution of Student Percentages",
-            color_discrete_sequence=['skyblue']
+        # Performance comparison table
+        st.subheader("Selected Students Comparison")
+        comparison_df = df.iloc[positions][['student_id', 'name', 'percentage', 'grade', 'status'] + subjects]
+        comparison_df.insert(2, 'rank', student_index.rank_of(positions))
+        show_paginated(comparison_df, np.arange(len(comparison_df)), key="comparison_page")
+    elif selected_students:
+        st.info("No students match the selection.")
+
+def render_statistical(ctx):
+    df, stats, subjects, cube = ctx['df'], ctx['stats'], ctx['subjects'], ctx['cube']
+    filters, filter_inputs = ctx['filters'], ctx['filter_inputs']
+    subject_stats = stats['subject_stats']
+    # Statistical analysis
+    st.subheader("Statistical Analysis")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Attendance vs Performance scatter plot
+        st.subheader("Attendance vs Performance")
+        fig_scatter = cached_figure(
+            ctx, 'attendance_scatter', build_attendance_scatter, df, config.CHART_POINT_BUDGET
         )
-        fig_hist.add_vline(x=df['percentage'].mean(), line_dash="dash", line_color="red", 
-                          annotation_text=f"Mean: {df['percentage'].mean():.1f}%")
-        st.plotly_chart(fig_hist, use_container_width=True)
-    
-    with tab2:
-        # Subject-wise performance comparison
-        st.subheader("Subject-wise Performance Comparison")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Box plot for subject scores - FIXED
-            subject_data = df[subjects].melt(var_name='Subject', value_name='Score')
-            fig_box = px.box(
-                subject_data, 
-                x='Subject', 
-                y='Score',
-                title="Score Distribution by Subject",
-                color='Subject'
-            )
-            # Fixed: Use update_layout instead of update_xaxis
-            fig_box.update_layout(xaxis_tickangle=45)
-            st.plotly_chart(fig_box, use_container_width=True)
-        
-        with col2:
-            # Average scores by subject
-            avg_scores = df[subjects].mean().sort_values(ascending=True)
-            fig_bar = px.bar(
-                x=avg_scores.values,
-                y=avg_scores.index,
-                orientation='h',
-                title="Average Scores by Subject",
-                color=avg_scores.values,
-                color_continuous_scale='viridis'
-            )
-            st.plotly_chart(fig_bar, use_container_width=True)
-        
-        # Correlation heatmap
-        st.subheader("Subject Correlation Analysis")
-        correlation_matrix = df[subjects].corr()
-        fig_heatmap = px.imshow(
-            correlation_matrix,
-            title="Subject Score Correlations",
-            color_continuous_scale='RdBu',
-            aspect='auto'
+        st.plotly_chart(fig_scatter, use_container_width=True)
+    
+    with col2:
+        # Semester-wise performance
+        st.subheader("Semester-wise Performance")
+        fig_semester = cached_figure(
+            ctx, 'semester_line', build_semester_line,
+            cube.mean('semester', **filters), inputs=filter_inputs
         )
-        st.plotly_chart(fig_heatmap, use_container_width=True)
+        st.plotly_chart(fig_semester, use_container_width=True)
     
-    with tab3:
-        # Individual student performance
-        st.subheader("Individual Student Performance Analysis")
-        
-        # Student selector
-        selected_students = st.multiselect(
-            "Select Students to Compare",
-            df['name'].tolist(),
-            default=df['name'].head(5).tolist()
+    # Additional charts in this section
+    st.subheader("Performance Distribution by Grade")
+    col3, col4 = st.columns(2)
+    
+    with col3:
+        # Violin plot for grade-wise score distribution
+        fig_violin = cached_figure(
+            ctx, 'grade_violin', build_grade_violin, df, config.CHART_POINT_BUDGET
         )
-        
-        if selected_students:
-            selected_df = df[df['name'].isin(selected_students)]
-            
-            # Radar chart for selected students
-            fig_radar = go.Figure()
-            
-            for _, student in selected_df.iterrows():
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=[student[subject] for subject in subjects],
-                    theta=subjects,
-                    fill='toself',
-                    name=student['name']
-                ))
-            
-            fig_radar.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[0, 100]
-                    )),
-                showlegend=True,
-                title="Student Performance Radar Chart"
-            )
-            st.plotly_chart(fig_radar, use_container_width=True)
-            
-            # Performance comparison table
-            st.subheader("Selected Students Comparison")
-            comparison_df = selected_df[['name', 'percentage', 'grade', 'status'] + subjects]
-            st.dataframe(comparison_df, use_container_width=True)
-    
-    with tab4:
-        # Statistical analysis
-        st.subheader("Statistical Analysis")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Attendance vs Performance scatter plot
-            st.subheader("Attendance vs Performance")
-            fig_scatter = px.scatter(
-                df, 
-                x='attendance', 
-                y='percentage',
-                color='grade',
-                title="Attendance vs Academic Performance",
-                hover_data=['name']
-            )
-            st.plotly_chart(fig_scatter, use_container_width=True)
-        
-        with col2:
-            # Semester-wise performance
-            st.subheader("Semester-wise Performance")
-            semester_avg = df.groupby('semester')['percentage'].mean().reset_index()
-            fig_semester = px.line(
-                semester_avg, 
-                x='semester', 
-                y='percentage',
-                title="Average Performance by Semester",
-                markers=True
-            )
-            st.plotly_chart(fig_semester, use_container_width=True)
-        
-        # Additional charts in tab4
-        st.subheader("Performance Distribution by Grade")
-        col3, col4 = st.columns(2)
-        
-        with col3:
-            # Violin plot for grade-wise score distribution
-            grade_data = df[['grade', 'percentage']].copy()
-            fig_violin = px.violin(
-                grade_data,
-                x='grade',
-                y='percentage',
-                title="Percentage Distribution by Grade",
-                box=True
-            )
-            st.plotly_chart(fig_violin, use_container_width=True)
-        
-        with col4:
-            # Subject difficulty analysis
-            subject_difficulty = df[subjects].std().sort_values(ascending=False)
-            fig_difficulty = px.bar(
-                x=subject_difficulty.values,
-                y=subject_difficulty.index,
-                orientation='h',
-                title="Subject Difficulty (Standard Deviation)",
-                color=subject_difficulty.values,
-                color_continuous_scale='Reds'
-            )
-            st.plotly_chart(fig_difficulty, use_container_width=True)
-        
-        # Statistical summary
-        st.subheader("Statistical Summary")
-        st.write("**Overall Statistics:**")
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.write(f"**Mean Percentage:** {df['percentage'].mean():.2f}%")
-            st.write(f"**Median Percentage:** {df['percentage'].median():.2f}%")
-            st.write(f"**Standard Deviation:** {df['percentage'].std():.2f}")
-        
-        with col2:
-            st.write(f"**Highest Score:** {df['percentage'].max():.2f}%")
-            st.write(f"**Lowest Score:** {df['percentage'].min():.2f}%")
-            st.write(f"**Range:** {df['percentage'].max() - df['percentage'].min():.2f}")
-        
-        with col3:
-            st.write(f"**Students Above 80%:** {(df['percentage'] >= 80).sum()}")
-            st.write(f"**Students Below 50%:** {(df['percentage'] < 50).sum()}")
-            st.write(f"**Average Attendance:** {df['attendance'].mean():.1f}%")
-        
-        # Subject-wise statistics table
-        st.subheader("Subject-wise Performance Statistics")
-        subject_stats = pd.DataFrame({
-            'Subject': subjects,
-            'Mean': [df[subject].mean() for subject in subjects],
-            'Median': [df[subject].median() for subject in subjects],
-            'Std Dev': [df[subject].std() for subject in subjects],
-            'Min': [df[subject].min() for subject in subjects],
-            'Max': [df[subject].max() for subject in subjects],
-            'Pass Rate (≥35)': [(df[subject] >= 35).sum() / len(df) * 100 for subject in subjects]
-        })
-        subject_stats = subject_stats.round(2)
-        st.dataframe(subject_stats, use_container_width=True)
-
-    # Additional insights section
-    st.header("🔍 Key Insights")
+        st.plotly_chart(fig_violin, use_container_width=True)
+    
+    with col4:
+        # Subject difficulty analysis
+        fig_difficulty = cached_figure(
+            ctx, 'difficulty_bar', build_difficulty_bar, get_covariance(ctx).std()
+        )
+        st.plotly_chart(fig_difficulty, use_container_width=True)
+    
+    # Statistical summary
+    st.subheader("Statistical Summary")
+    st.write("**Overall Statistics:**")
+    percentage_stats = stats['percentage_stats']
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.write(f"**Mean Percentage:** {percentage_stats['mean']:.2f}%")
+        st.write(f"**Median Percentage:** {percentage_stats['median']:.2f}%")
+        st.write(f"**Standard Deviation:** {percentage_stats['std']:.2f}")
+    
+    with col2:
+        st.write(f"**Highest Score:** {percentage_stats['max']:.2f}%")
+        st.write(f"**Lowest Score:** {percentage_stats['min']:.2f}%")
+        st.write(f"**Range:** {percentage_stats['max'] - percentage_stats['min']:.2f}")
+    
+    with col3:
+        st.write(f"**Students Above 80%:** {stats['students_above_80']}")
+        st.write(f"**Students Below 50%:** {stats['students_below_50']}")
+        st.write(f"**Average Attendance:** {stats['average_attendance']:.1f}%")
+    
+    # Subject-wise statistics table
+    st.subheader("Subject-wise Performance Statistics")
+    pass_rates = cube.subject_pass_rates()
+    pass_marks = ctx['policy'].subject_marks(subjects)
+    pass_rate_label = f"Pass Rate (≥{pass_marks.iloc[0]:g})" if pass_marks.nunique() == 1 else "Pass Rate"
+    subject_table = pd.DataFrame({
+        'Subject': subjects,
+        'Mean': [subject_stats[subject]['mean'] for subject in subjects],
+        'Median': [subject_stats[subject]['median'] for subject in subjects],
+        'Std Dev': [subject_stats[subject]['std'] for subject in subjects],
+        'Min': [subject_stats[subject]['min'] for subject in subjects],
+        'Max': [subject_stats[subject]['max'] for subject in subjects],
+        pass_rate_label: pass_rates[subjects].to_numpy()
+    })
+    subject_table = subject_table.round(2)
+    st.dataframe(subject_table, use_container_width=True)
+
+def render_insights(ctx):
+    df, stats = ctx['df'], ctx['stats']
+    rank_index = get_rank_index(ctx)
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📊 Performance Insights")
-        
+    
         # Top 5 performers
-        top_performers = df.nlargest(5, 'percentage')[['name', 'percentage', 'grade']]
+        top_performers = df.iloc[rank_index.top_k(5)][['name', 'percentage', 'grade']]
         st.write("**Top 5 Performers:**")
         for i, row in top_performers.iterrows():
-            st.write(f"🏆 {row['name']}: {row['percentage']}% ({row['grade']})")
-        
+            st.write(f"🏆 {row['name']}: {row['percentage']:.2f}% ({row['grade']})")
+    
         # Subject with highest average
-        best_subject = df[subjects].mean().idxmax()
-        best_avg = df[subjects].mean().max()
+        subject_averages = stats['subject_averages']
+        best_subject = max(subject_averages, key=subject_averages.get)
+        best_avg = subject_averages[best_subject]
         st.write(f"**Best Performing Subject:** {best_subject} ({best_avg:.1f}%)")
-        
+    
     with col2:
         st.subheader("⚠️ Areas for Improvement")
-        
+    
         # Bottom 5 performers
-        bottom_performers = df.nsmallest(5, 'percentage')[['name', 'percentage', 'grade']]
+        bottom_performers = df.iloc[rank_index.bottom_k(5)][['name', 'percentage', 'grade']]
         st.write("**Students Needing Support:**")
         for i, row in bottom_performers.iterrows():
-            st.write(f"📚 {row['name']}: {row['percentage']}% ({row['grade']})")
-        
+            st.write(f"📚 {row['name']}: {row['percentage']:.2f}% ({row['grade']})")
+    
         # Subject with lowest average
-        weak_subject = df[subjects].mean().idxmin()
-        weak_avg = df[subjects].mean().min()
+        weak_subject = min(subject_averages, key=subject_averages.get)
+        weak_avg = subject_averages[weak_subject]
         st.write(f"**Most Challenging Subject:** {weak_subject} ({weak_avg:.1f}%)")
 
+# section key -> (label, render function)
+SECTIONS = {
+    'distribution': ("📈 Distribution Analysis", render_distribution),
+    'comparative': ("📊 Comparative Analysis", render_comparative),
+    'individual': ("🎯 Individual Performance", render_individual),
+    'statistical': ("📉 Statistical Analysis", render_statistical),
+    'insights': ("🔍 Key Insights", render_insights),
+}
+
+def main():
+    profiler = RenderProfiler() if config.PROFILING_ENABLED else NullProfiler()
+    st.title("🎓 Academic Performance Analysis")
+    st.markdown("---")
+    
+    # Sidebar for controls
+    st.sidebar.header("📋 Analysis Controls")
+    store_path = os.path.join(ROOT_DIR, config.DATA_FILE_PATH)
+    data_sources = ["Generated"]
+    if os.path.exists(os.path.join(store_path, MANIFEST_NAME)):
+        data_sources.append("Stored Cohort")
+    data_source = st.sidebar.radio("Data Source", data_sources)
+    
+    # Everything derived from the cohort is cached under its key
+    if data_source == "Stored Cohort":
+        # Only the requested rows are read from the memory-mapped store
+        store = open_cohort_store(store_path)
+        row_range = st.sidebar.slider(
+            "Rows to Analyse", 0, len(store), (0, min(len(store), 100_000)), step=1
+        )
+        manifest_mtime = os.path.getmtime(os.path.join(store_path, MANIFEST_NAME))
+        cohort_key = ('store', store_path, manifest_mtime, row_range[0], row_range[1], config.DATA_VERSION)
+    else:
+        num_students = st.sidebar.slider("Number of Students", 20, 100, 50)
+        cohort_key = ('generated', num_students, config.RANDOM_SEED, config.DATA_VERSION)
+    
+    institution = DEFAULT_POLICY
+    if config.INSTITUTION_POLICIES:
+        institution = st.sidebar.selectbox(
+            "Grading Policy", [DEFAULT_POLICY] + list(config.INSTITUTION_POLICIES)
+        )
+    policy = get_policy(institution)
+    
+    cache = get_dashboard_cache()
+    load_stage = 'read_cohort_store' if cohort_key[0] == 'store' else 'get_dataframe'
+    df = get_session_cohort(cohort_key, profiler.wrap(load_stage, load_cohort))
+    if institution != DEFAULT_POLICY:
+        # Regrade the loaded scores in one batch; everything derived is keyed by policy too
+        df = cache.get_or_compute(('regraded', cohort_key, institution), profiler.wrap('regrade', policy.regrade), df)
+        cohort_key = cohort_key + (institution,)
+    # An institution's policy may grade on its own subset of the subjects
+    subjects = policy.subjects
+    stats = cache.get_or_compute(
+        ('stats', cohort_key), profiler.wrap('get_summary_stats', get_summary_stats), df, policy
+    )
+    cube = cache.get_or_compute(
+        ('cube', cohort_key), profiler.wrap('cube', PerformanceCube.from_frame), df, subjects, policy=policy
+    )
+    
+    # Drill-down filters for the panels answered from the cube; empty means all
+    with st.sidebar.expander("🔎 Drill-down"):
+        filters = {
+            'semester': st.multiselect("Semester", SEMESTERS),
+            'status': st.multiselect("Status", STATUSES),
+            'attendance_band': st.multiselect("Attendance", attendance_band_labels()),
+        }
+    filters = {dimension: labels for dimension, labels in filters.items() if labels}
+    filter_inputs = tuple((dimension, tuple(labels)) for dimension, labels in filters.items())
+    if filters:
+        st.sidebar.caption(f"{cube.total_count(**filters):,} students match the drill-down")
+    
+    ctx = {
+        'cache': cache,
+        'profiler': profiler,
+        'cohort_key': cohort_key,
+        'df': df,
+        'subjects': subjects,
+        'stats': stats,
+        'cube': cube,
+        'filters': filters,
+        'filter_inputs': filter_inputs,
+        'policy': policy,
+    }
+    
+    # Display summary metrics
+    st.header("📈 Key Performance Metrics")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Students", stats['total_students'])
+    with col2:
+        st.metric("Pass Rate", f"{stats['pass_rate']}%")
+    with col3:
+        st.metric("Average Percentage", f"{stats['average_percentage']}%")
+    with col4:
+        st.metric("Top Performer", stats['highest_scorer'])
+    
+    # Data overview
+    st.header("📋 Student Data Overview")
+    if st.checkbox("Show Raw Data"):
+        render_data_explorer(ctx)
+    
+    # Charts section
+    st.header("📊 Performance Analysis Charts")
+    
+    # Only the selected section runs; switching sections reruns just that one
+    section = st.radio(
+        "Section", list(SECTIONS), format_func=lambda key: SECTIONS[key][0],
+        horizontal=True, label_visibility="collapsed", key="section"
+    )
+    with profiler.stage(f'section.{section}'):
+        SECTIONS[section][1](ctx)
+
     # Footer
     st.markdown("---")
     st.markdown("**📊 BCA Student Performance Analysis Dashboard** | Built with Streamlit & Plotly")
+    
+    if profiler.enabled:
+        record = profiler.finish()
+        history = get_profile_history()
+        history.add(record)
+        show_profile(record, history)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
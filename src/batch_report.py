@@ -0,0 +1,141 @@
+"""Headless batch reports: render every dashboard figure for many cohorts.
+
+Each cohort is generated (one per ``--students`` x ``--seeds`` pair) or read
+from cohort stores (``--store``), reduced once to the shared aggregates, and
+every figure in ``utils.figures.FIGURES`` is written as HTML, JSON and/or PNG
+under ``OUTPUT/<cohort>/``. Cohorts are spread over a process pool. The time
+spent loading, aggregating, building and writing each cohort is printed and
+saved with the list of written files in ``OUTPUT/report.json``.
+
+    python src/batch_report.py reports --students 1000 100000 --seeds 1 2 3
+    python src/batch_report.py reports --store data/cohort --formats html json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.extend([SRC_DIR, os.path.dirname(SRC_DIR)])
+
+from data.cohort_store import open_cohort_store
+from data.students_data import generate_students_frame, get_subjects
+from utils.figures import FIGURES, build_figures, compute_aggregates
+
+FORMATS = ['html', 'json', 'png']
+STAGES = ['load', 'aggregate', 'build', 'write']
+
+
+def cohort_name(cohort):
+    if cohort['source'] == 'store':
+        return os.path.basename(os.path.normpath(cohort['path']))
+    return f"generated-{cohort['students']}-seed{cohort['seed']}"
+
+
+def load_cohort(cohort):
+    """Return the DataFrame of a cohort description"""
+    if cohort['source'] == 'store':
+        return open_cohort_store(cohort['path']).read()
+    return generate_students_frame(cohort['students'], random_state=cohort['seed'])
+
+
+def write_figure(fig, path, fmt):
+    if fmt == 'html':
+        # The Plotly library is loaded from its CDN instead of being embedded in every file
+        fig.write_html(path, include_plotlyjs='cdn')
+    elif fmt == 'json':
+        fig.write_json(path)
+    else:
+        fig.write_image(path)
+
+
+def render_cohort(cohort, output, formats, names=None):
+    """Render the figures of one cohort; return its timings and written files"""
+    seconds = {}
+    start = time.perf_counter()
+    df = load_cohort(cohort)
+    seconds['load'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    aggregates = compute_aggregates(df, get_subjects())
+    seconds['aggregate'] = time.perf_counter() - start
+
+    figures, figure_seconds = build_figures(aggregates, names)
+    seconds['build'] = sum(figure_seconds.values())
+
+    start = time.perf_counter()
+    directory = os.path.join(output, cohort_name(cohort))
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for name, fig in figures.items():
+        for fmt in formats:
+            path = os.path.join(directory, f'{name}.{fmt}')
+            write_figure(fig, path, fmt)
+            files.append(path)
+    seconds['write'] = time.perf_counter() - start
+
+    return {
+        'cohort': cohort_name(cohort),
+        'students': len(df),
+        'seconds': seconds,
+        'figure_seconds': figure_seconds,
+        'files': files,
+    }
+
+
+def _render(args):
+    return render_cohort(*args)
+
+
+def run_batch(cohorts, output, formats, names=None, max_workers=None):
+    """Render every cohort, in parallel unless ``max_workers`` is 1"""
+    tasks = [(cohort, output, formats, names) for cohort in cohorts]
+    if max_workers == 1 or len(tasks) <= 1:
+        return [_render(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_render, tasks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', help='directory to write the reports to')
+    parser.add_argument('--students', type=int, nargs='*', default=[],
+                        help='generate a cohort of each of these sizes (per seed)')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[42])
+    parser.add_argument('--store', nargs='*', default=[], help='cohort store directories to report on')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=['html'])
+    parser.add_argument('--figures', nargs='+', choices=list(FIGURES), help='only render these figures')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    cohorts = [{'source': 'store', 'path': path} for path in args.store]
+    cohorts += [
+        {'source': 'generated', 'students': students, 'seed': seed}
+        for students in args.students for seed in args.seeds
+    ]
+    if not cohorts:
+        parser.error('give at least one of --students or --store')
+    if 'png' in args.formats and importlib.util.find_spec('kaleido') is None:
+        parser.error('PNG output needs the kaleido package (pip install kaleido)')
+
+    start = time.perf_counter()
+    results = run_batch(cohorts, args.output, args.formats, args.figures, args.workers)
+    wall = time.perf_counter() - start
+
+    print(f"{'cohort':<36} {'students':>12}" + ''.join(f' {stage:>10}' for stage in STAGES))
+    for result in results:
+        timings = ''.join(f" {result['seconds'][stage]:>9.3f}s" for stage in STAGES)
+        print(f"{result['cohort']:<36} {result['students']:>12,}{timings}")
+    totals = {stage: sum(result['seconds'][stage] for result in results) for stage in STAGES}
+    print(f"{len(results)} cohorts in {wall:.2f}s wall; "
+          + ', '.join(f'{stage} {seconds:.2f}s' for stage, seconds in totals.items()))
+
+    with open(os.path.join(args.output, 'report.json'), 'w') as f:
+        json.dump({'wall_seconds': wall, 'stage_seconds': totals, 'cohorts': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
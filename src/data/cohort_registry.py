@@ -0,0 +1,225 @@
+"""Process-wide registry of the cohorts viewed by dashboard sessions.
+
+Every browser session runs the dashboard script on its own, but sessions
+viewing the same cohort should share one copy of it. ``CohortRegistry``
+loads each cohort once per server process. A session that asks for a cohort
+while it is still loading waits for that load instead of starting another.
+Every session then gets the same DataFrame, built on read-only views of the
+column arrays, so no session can change what the others see.
+
+A ``CohortLease`` counts one session as a user of a cohort until the session
+moves to another cohort or ends. Cohorts that no session holds are evicted,
+least recently used first, once the registry is over its memory budget.
+
+With a ``spill_dir``, each cohort is also written once as a cohort store and
+served from its memory-mapped columns. The numeric data then lives in the OS
+page cache, which other server processes on the host share, and a restarted
+server opens the store instead of generating the cohort again. A cohort's
+spill store is deleted when the cohort is evicted, so the spill directory
+holds no more than the registry does. Cohorts read from a cohort store are
+already memory-mapped and are acquired with ``spill=False``.
+"""
+import hashlib
+import os
+import shutil
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from data.cohort_store import MANIFEST_NAME, open_cohort_store, write_cohort_store
+
+
+def _readonly(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def freeze_frame(df):
+    """Return ``df`` rebuilt on read-only views of its column arrays
+
+    Nothing is copied. Numeric columns become read-only views and categorical
+    columns keep their categories over read-only codes. Other extension
+    columns are kept as they are.
+    """
+    columns = {}
+    for name, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[name] = pd.Categorical.from_codes(_readonly(series.array.codes), dtype=series.dtype)
+        elif isinstance(series.dtype, np.dtype):
+            columns[name] = _readonly(series.to_numpy())
+        else:
+            columns[name] = series.array
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def _is_mapped(array):
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def resident_nbytes(df):
+    """Return the bytes of ``df`` held in process memory
+
+    Memory-mapped columns are left out, since their pages belong to the OS
+    page cache.
+    """
+    total = 0
+    for _, series in df.items():
+        if isinstance(series.dtype, np.dtype) and _is_mapped(series.to_numpy()):
+            continue
+        total += int(series.memory_usage(deep=True, index=False))
+    return total
+
+
+def spill_name(key):
+    """Return the spill store directory name of a cohort key"""
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+class CohortLease:
+    """One user's hold on a registry cohort, released once (or when garbage collected)"""
+
+    def __init__(self, registry, key, frame):
+        self.key = key
+        self.frame = frame
+        self._release = weakref.finalize(self, registry.release, key)
+
+    @property
+    def active(self):
+        return self._release.alive
+
+    def release(self):
+        self._release()
+
+
+class CohortRegistry:
+    """Cohorts shared by every session of the process, with reference counts
+
+    ``max_bytes`` caps the resident size of the registry. Only cohorts that
+    no lease holds are evicted to meet it, so cohorts in use stay even when
+    they alone exceed it.
+    """
+
+    def __init__(self, max_bytes=None, spill_dir=None, sizeof=resident_nbytes):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # key -> [frame, nbytes, references, spill path or None]
+        self._loading = {}  # key -> Event set when its load finishes
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def references(self, key):
+        """Return how many users hold the cohort of ``key``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[2] if entry else 0
+
+    def acquire(self, key, load, *args, spill=True):
+        """Return the cohort of ``key`` and count one more user of it
+
+        ``load(*args)`` is called on the first request only. Requests that
+        arrive while it runs wait for it. Every ``acquire`` needs a matching
+        ``release``; ``lease`` pairs them automatically. With ``spill=False``
+        the cohort is not written to the spill directory.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry[2] += 1
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Another request is loading this cohort; use its result (or retry if it failed)
+            loading.wait()
+
+        try:
+            frame, spill_path = self._materialize(key, load, args, spill)
+            nbytes = self.sizeof(frame)
+        except BaseException:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+            raise
+        with self._lock:
+            self._entries[key] = [frame, nbytes, 1, spill_path]
+            self._nbytes += nbytes
+            self.loads += 1
+            del self._loading[key]
+            self._evict()
+        loading.set()
+        return frame
+
+    def release(self, key):
+        """Count one user fewer of the cohort of ``key``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] == 0:
+                raise KeyError(f"cohort {key!r} is not acquired")
+            entry[2] -= 1
+            self._evict()
+
+    def lease(self, key, load, *args, spill=True):
+        """Return a ``CohortLease`` on the cohort of ``key``, loading it if needed"""
+        return CohortLease(self, key, self.acquire(key, load, *args, spill=spill))
+
+    def clear(self):
+        """Drop every cohort that no lease holds"""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[2] == 0]:
+                self._remove(key)
+
+    def _materialize(self, key, load, args, spill):
+        if self.spill_dir is None or not spill:
+            return freeze_frame(load(*args)), None
+        path = os.path.join(self.spill_dir, spill_name(key))
+        if not os.path.exists(os.path.join(path, MANIFEST_NAME)):
+            tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+            write_cohort_store(tmp_path, [load(*args)], {'cohort_key': repr(key)})
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                # Another server process spilled the same cohort first
+                shutil.rmtree(tmp_path, ignore_errors=True)
+        return freeze_frame(open_cohort_store(path).read()), path
+
+    def _remove(self, key):
+        _, nbytes, _, spill_path = self._entries.pop(key)
+        self._nbytes -= nbytes
+        if spill_path is not None:
+            # Open memory maps keep their pages until they are dropped, so
+            # frames still referenced elsewhere remain readable
+            shutil.rmtree(spill_path, ignore_errors=True)
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        for key in list(self._entries):
+            if self._nbytes <= self.max_bytes:
+                break
+            if self._entries[key][2] == 0:
+                self._remove(key)
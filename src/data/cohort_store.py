@@ -0,0 +1,247 @@
+"""Columnar on-disk storage for student cohorts.
+
+A cohort store is a directory holding a ``cohort.json`` manifest and one
+sub-directory per part (``part-00000``, ``part-00001``, ...) with one ``.npy``
+file per column. Columns are memory-mapped on read, so opening a store only
+parses the manifest and a read only touches the requested columns of the
+parts that overlap the requested row range.
+
+Column encodings:
+    numeric      stored as-is
+    categorical  int codes in ``<column>.npy`` plus the part's categories in
+                 ``<column>.categories.npy``
+    string       fixed-width unicode array
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+
+if __name__ == "__main__":
+    SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.extend([SRC_DIR, os.path.dirname(SRC_DIR)])
+
+import numpy as np
+import pandas as pd
+
+from data.schema import apply_schema, concat_categoricals
+from data.students_data import generate_chunk
+
+MANIFEST_NAME = 'cohort.json'
+STORE_VERSION = 1
+
+
+def _part_name(part_index):
+    return f'part-{part_index:05d}'
+
+
+def _encode_column(series):
+    """Return (array, categories, column_meta) for one column of a chunk"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.to_numpy().astype(str)
+        return series.cat.codes.to_numpy(), categories, {'kind': 'category'}
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy(), None, {'kind': 'numeric'}
+    return series.to_numpy().astype(str), None, {'kind': 'string'}
+
+
+class CohortStore:
+    """Read access to a cohort store directory"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+        self.columns = self.manifest['columns']
+        self.part_rows = np.array([part['rows'] for part in self.manifest['parts']], dtype=np.int64)
+        self.part_offsets = np.concatenate([[0], np.cumsum(self.part_rows)])
+
+    def __len__(self):
+        return int(self.part_offsets[-1])
+
+    def _parts_in_range(self, start, stop):
+        """Yield (part_index, local_start, local_stop) covering rows [start, stop)"""
+        first = np.searchsorted(self.part_offsets, start, side='right') - 1
+        for part_index in range(max(first, 0), len(self.part_rows)):
+            part_start = self.part_offsets[part_index]
+            if part_start >= stop:
+                break
+            yield part_index, max(start - part_start, 0), min(stop, self.part_offsets[part_index + 1]) - part_start
+
+    def _normalize_range(self, start, stop):
+        total = len(self)
+        start = 0 if start is None else min(max(start, 0), total)
+        stop = total if stop is None else min(max(stop, start), total)
+        return start, stop
+
+    def column(self, name, start=None, stop=None):
+        """Return rows [start, stop) of one column as a NumPy array or Categorical"""
+        if name not in self.columns:
+            raise KeyError(name)
+        start, stop = self._normalize_range(start, stop)
+        pieces = []
+        categories = []
+        for part_index, lo, hi in self._parts_in_range(start, stop):
+            part_dir = os.path.join(self.path, _part_name(part_index))
+            array = np.load(os.path.join(part_dir, f'{name}.npy'), mmap_mode='r')[lo:hi]
+            kind = self.manifest['parts'][part_index]['columns'][name]['kind']
+            if kind == 'category':
+                array = np.asarray(array)
+                categories.append(np.load(os.path.join(part_dir, f'{name}.categories.npy')).astype(object))
+            elif kind == 'string':
+                array = np.asarray(array).astype(object)
+            pieces.append(array)
+        if not pieces:
+            return np.array([])
+        if categories:
+            return concat_categoricals(pieces, categories)
+        if len(pieces) == 1:
+            return pieces[0]
+        return np.concatenate(pieces)
+
+    def read(self, columns=None, start=None, stop=None):
+        """Return rows [start, stop) of the selected columns as a DataFrame
+
+        Columns are converted to the compact dtypes of
+        ``data.schema.STUDENT_SCHEMA``. Numeric columns within one part that
+        already have those dtypes stay read-only memory-mapped views.
+        """
+        columns = self.columns if columns is None else list(columns)
+        start, stop = self._normalize_range(start, stop)
+        data = {name: self.column(name, start, stop) for name in columns}
+        return apply_schema(pd.DataFrame(data, index=pd.RangeIndex(start, stop), copy=False))
+
+
+def open_cohort_store(path):
+    """Open the cohort store at ``path`` without loading any column data"""
+    return CohortStore(path)
+
+
+def _write_manifest(path, manifest):
+    tmp_path = os.path.join(path, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_NAME))
+
+
+def _write_part(path, part_index, chunk):
+    """Write one chunk as a part directory and return its manifest entry"""
+    part_dir = os.path.join(path, _part_name(part_index))
+    tmp_dir = part_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    columns = {}
+    for name in chunk.columns:
+        array, categories, meta = _encode_column(chunk[name])
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), array)
+        if categories is not None:
+            np.save(os.path.join(tmp_dir, f'{name}.categories.npy'), categories)
+        columns[name] = meta
+    shutil.rmtree(part_dir, ignore_errors=True)
+    os.replace(tmp_dir, part_dir)
+    return {'rows': len(chunk), 'columns': columns}
+
+
+def write_cohort_store(path, chunks, metadata=None):
+    """Write an iterable of DataFrame chunks to a new cohort store at ``path``
+
+    Chunks are written one at a time, so the cohort never has to fit in
+    memory. Any existing store at ``path`` is replaced. ``metadata`` is kept
+    in the manifest as-is. Returns the opened ``CohortStore``.
+    """
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    manifest = {'version': STORE_VERSION, 'metadata': metadata or {}, 'columns': None, 'parts': []}
+    for part_index, chunk in enumerate(chunks):
+        if manifest['columns'] is None:
+            manifest['columns'] = list(chunk.columns)
+        elif list(chunk.columns) != manifest['columns']:
+            raise ValueError(f"chunk {part_index} has columns {list(chunk.columns)}, expected {manifest['columns']}")
+        manifest['parts'].append(_write_part(path, part_index, chunk))
+        _write_manifest(path, manifest)
+    if manifest['columns'] is None:
+        raise ValueError("cannot write a cohort store without any chunks")
+    return open_cohort_store(path)
+
+
+def regrade_cohort_store(path, policy):
+    """Recompute ``grade`` and ``status`` of every part under a grading policy
+
+    Only the subject and percentage columns are read (memory-mapped) and only
+    the grade and status files are rewritten, one part at a time, so millions
+    of students are regraded without regenerating or loading the cohort.
+    Returns the reopened ``CohortStore``.
+    """
+    store = open_cohort_store(path)
+    manifest = store.manifest
+    for part_index in range(len(manifest['parts'])):
+        part_dir = os.path.join(path, _part_name(part_index))
+        percentage = np.load(os.path.join(part_dir, 'percentage.npy'), mmap_mode='r')
+        scores = np.column_stack([
+            np.load(os.path.join(part_dir, f'{subject}.npy'), mmap_mode='r') for subject in policy.subjects
+        ])
+        regraded = {
+            'grade': policy.grades(percentage),
+            'status': policy.statuses(scores, percentage),
+        }
+        for name, values in regraded.items():
+            for suffix, array in (('', values.codes), ('.categories', values.categories.to_numpy().astype(str))):
+                file_path = os.path.join(part_dir, f'{name}{suffix}.npy')
+                # np.save appends .npy to names without it
+                np.save(file_path + '.tmp.npy', array)
+                os.replace(file_path + '.tmp.npy', file_path)
+            manifest['parts'][part_index]['columns'][name] = {'kind': 'category'}
+    manifest['metadata']['grading_policy'] = policy.name
+    _write_manifest(path, manifest)
+    return open_cohort_store(path)
+
+
+def generate_cohort_store(path, num_students, chunk_size=100_000, random_state=42):
+    """Generate a synthetic cohort straight into a cohort store
+
+    The parts are the chunks of ``iter_dataframe_chunks``. The manifest is
+    updated after every part, so calling this again with the same parameters
+    after an interruption resumes from the first part that was not finished.
+    Returns the opened ``CohortStore``.
+    """
+    metadata = {'num_students': num_students, 'chunk_size': chunk_size, 'random_state': random_state}
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        generated = {key: manifest['metadata'].get(key) for key in metadata}
+        if generated != metadata:
+            raise ValueError(f"{path} holds a different cohort: {manifest['metadata']}")
+    else:
+        os.makedirs(path, exist_ok=True)
+        manifest = {'version': STORE_VERSION, 'metadata': metadata, 'columns': None, 'parts': []}
+
+    num_chunks = -(-num_students // chunk_size)
+    for part_index in range(len(manifest['parts']), num_chunks):
+        chunk = generate_chunk(num_students, chunk_size, random_state, part_index)
+        manifest['columns'] = list(chunk.columns)
+        manifest['parts'].append(_write_part(path, part_index, chunk))
+        _write_manifest(path, manifest)
+    return open_cohort_store(path)
+
+
+if __name__ == "__main__":
+    from analysis.grading import get_policy
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic cohort into a cohort store")
+    parser.add_argument('path', help="store directory, e.g. data/cohort")
+    parser.add_argument('--students', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--regrade', metavar='INSTITUTION', nargs='?', const='default',
+                        help="regrade the existing store under a grading policy instead of generating")
+    args = parser.parse_args()
+
+    if args.regrade:
+        store = regrade_cohort_store(args.path, get_policy(args.regrade))
+        print(f"Regraded {len(store):,} students in {args.path} under the {args.regrade!r} policy")
+    else:
+        store = generate_cohort_store(args.path, args.students, args.chunk_size, args.seed)
+        print(f"Wrote {len(store):,} students in {len(store.part_rows)} parts to {args.path}")
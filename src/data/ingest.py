@@ -0,0 +1,345 @@
+"""Bulk ingestion of marksheet exports (CSV/Excel) into the student schema.
+
+Each file is read in chunks with explicit dtypes. Its headers are mapped onto
+``student_id``, ``name``, the subjects, ``semester`` and ``attendance``. Rows
+with missing or out-of-range values, or with a student id already seen, are
+rejected and counted by reason. ``total_marks``, ``percentage``, ``grade``
+and ``status`` are then computed per chunk with array operations and the
+grading policy, and the chunk is converted to the compact dtypes of
+``data.schema``. Files are parsed in a process pool, a few at a time. The
+accepted rows are either returned as one DataFrame or written as a cohort
+store, which the dashboard opens as its "Stored Cohort" data source.
+
+    python src/data/ingest.py data/cohort marksheets/*.csv --map "Roll No=student_id"
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+if __name__ == "__main__":
+    SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.extend([SRC_DIR, os.path.dirname(SRC_DIR)])
+
+import numpy as np
+import pandas as pd
+
+from analysis.grading import get_policy
+from data.cohort_store import write_cohort_store
+from data.schema import apply_schema, concat_categoricals, student_schema
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls', '.ods')
+
+# Cells marksheets use for absent or withheld marks; read as missing
+MISSING_MARKERS = ['', '-', 'NA', 'N/A', 'AB', 'ABS', 'Absent']
+
+# Rejection reasons, in the order rows are checked; a row counts once, under its first
+REJECT_REASONS = ['missing_value', 'non_numeric', 'score_out_of_range', 'semester_out_of_range',
+                  'attendance_out_of_range', 'duplicate_id']
+
+
+def _normalize_header(header):
+    return re.sub(r'[^a-z0-9]+', '_', str(header).strip().lower()).strip('_')
+
+
+def resolve_columns(headers, subjects, column_map=None):
+    """Return {file header: schema column} for the headers of one file
+
+    ``column_map`` maps file headers to schema columns. Headers not in it
+    match a schema column when they are equal after lower-casing and
+    replacing punctuation and spaces, e.g. "Student ID" or "student-id".
+    Raises ``ValueError`` naming the schema columns no header maps to.
+    """
+    wanted = ['student_id', 'name', *subjects, 'semester', 'attendance']
+    by_normalized = {_normalize_header(column): column for column in wanted}
+    column_map = column_map or {}
+    resolved = {}
+    for header in headers:
+        column = column_map.get(header) or by_normalized.get(_normalize_header(header))
+        if column in wanted and column not in resolved.values():
+            resolved[header] = column
+    missing = [column for column in wanted if column not in resolved.values()]
+    if missing:
+        raise ValueError(f"no column for {missing} among {list(headers)}")
+    return resolved
+
+
+def _read_headers(path):
+    if path.lower().endswith(EXCEL_EXTENSIONS):
+        return list(pd.read_excel(path, nrows=0).columns)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_raw_chunks(path, resolved, chunk_size):
+    """Yield the mapped columns of a marksheet as DataFrames of ``chunk_size`` rows
+
+    Every column is read as text, so a malformed number rejects its row in
+    ``normalize_chunk`` instead of failing the whole file. CSV files are
+    streamed. Excel files have no chunked reader, so the mapped columns are
+    read in one go and then sliced.
+    """
+    options = {'usecols': list(resolved), 'dtype': str,
+               'na_values': MISSING_MARKERS, 'keep_default_na': True}
+    if path.lower().endswith(EXCEL_EXTENSIONS):
+        sheet = pd.read_excel(path, **options)
+        chunks = (sheet.iloc[start:start + chunk_size] for start in range(0, len(sheet), chunk_size))
+    else:
+        chunks = pd.read_csv(path, chunksize=chunk_size, **options)
+    for chunk in chunks:
+        yield chunk.rename(columns=resolved)
+
+
+def _to_numbers(column):
+    """Return (values, present) for a text column: float64 values (NaN where
+    the cell is not a number) and whether each cell had any value at all"""
+    text = column.str.strip()
+    try:
+        values = text.astype(np.float64)
+    except ValueError:
+        # Some cell is not a number; the slower coercing parse finds which
+        values = pd.to_numeric(text, errors='coerce')
+    return values.to_numpy(dtype=np.float64, na_value=np.nan), column.notna().to_numpy()
+
+
+def normalize_chunk(raw, policy, seen_ids=None):
+    """Validate one mapped chunk and derive the computed columns
+
+    Returns ``(frame, rejected)``: the accepted rows in the student schema and
+    {reason: rows} of the rest. Scores are rounded to whole marks. Ids in the
+    set ``seen_ids`` (and repeats within the chunk) are rejected as
+    duplicates; the accepted ids are added to it. Only rows that pass every
+    other check take part in the duplicate check.
+    """
+    subjects = policy.subjects
+    # Plain object arrays: the id checks below iterate over them in Python
+    student_id = raw['student_id'].str.strip().to_numpy(dtype=object)
+    name = raw['name'].str.strip().to_numpy(dtype=object)
+    numbers = {column: _to_numbers(raw[column]) for column in [*subjects, 'semester', 'attendance']}
+    scores = np.rint(np.column_stack([numbers[subject][0] for subject in subjects]))
+    semester = numbers['semester'][0]
+    attendance = numbers['attendance'][0]
+    present = np.column_stack([numbers[column][1] for column in numbers])
+    parsed = ~np.column_stack([np.isnan(numbers[column][0]) for column in numbers])
+
+    with np.errstate(invalid='ignore'):
+        checks = {
+            'missing_value': pd.isna(student_id) | (student_id == '') | pd.isna(name) | ~present.all(axis=1),
+            'non_numeric': (present & ~parsed).any(axis=1),
+            'score_out_of_range': ((scores < 0) | (scores > 100)).any(axis=1),
+            'semester_out_of_range': (semester < 1) | (semester > 6) | (semester != np.rint(semester)),
+            'attendance_out_of_range': (attendance < 0) | (attendance > 100),
+        }
+    rejected_mask = np.zeros(len(raw), dtype=bool)
+    rejected = {}
+    for reason, failed in checks.items():
+        failed = failed & ~rejected_mask
+        rejected[reason] = int(failed.sum())
+        rejected_mask |= failed
+
+    # A rejected row does not claim its id, so a later valid row with it is kept
+    valid = np.flatnonzero(~rejected_mask)
+    duplicate = np.zeros(len(raw), dtype=bool)
+    duplicate[valid] = pd.Index(student_id[valid]).duplicated()
+    if seen_ids is not None:
+        duplicate[valid] |= np.fromiter((value in seen_ids for value in student_id[valid]),
+                                        dtype=bool, count=len(valid))
+    rejected['duplicate_id'] = int(duplicate.sum())
+    keep = ~(rejected_mask | duplicate)
+    if seen_ids is not None:
+        seen_ids.update(student_id[keep])
+
+    scores = scores[keep]
+    total_marks = scores.sum(axis=1)
+    percentage = np.round(total_marks / len(subjects), 2)
+    data = {
+        'student_id': student_id[keep],
+        'name': name[keep],
+    }
+    for i, subject in enumerate(subjects):
+        data[subject] = scores[:, i]
+    data.update({
+        'total_marks': total_marks,
+        'percentage': percentage,
+        'grade': policy.grades(percentage),
+        'status': policy.statuses(scores, percentage),
+        'semester': semester[keep],
+        'attendance': np.rint(attendance[keep]),
+    })
+    return apply_schema(pd.DataFrame(data), student_schema(subjects)), rejected
+
+
+def iter_marksheet(path, policy, column_map=None, chunk_size=100_000, report=None):
+    """Yield the accepted rows of one marksheet file as schema DataFrames
+
+    Each chunk of at most ``chunk_size`` rows is read, normalized and yielded
+    before the next one is read. Duplicate ids are rejected within the file.
+    When a ``report`` dict is given it is filled in with the file's row
+    counts and time as the chunks are read.
+    """
+    start = time.perf_counter()
+    report = {} if report is None else report
+    report.update({'path': path, 'rows_read': 0, 'rows_accepted': 0,
+                   'rejected': dict.fromkeys(REJECT_REASONS, 0), 'seconds': 0.0})
+    resolved = resolve_columns(_read_headers(path), policy.subjects, column_map)
+    seen_ids = set()
+    for raw in iter_raw_chunks(path, resolved, chunk_size):
+        frame, chunk_rejected = normalize_chunk(raw, policy, seen_ids)
+        report['rows_read'] += len(raw)
+        report['rows_accepted'] += len(frame)
+        for reason, rows in chunk_rejected.items():
+            report['rejected'][reason] += rows
+        report['seconds'] = time.perf_counter() - start
+        if len(frame):
+            yield frame
+
+
+def parse_marksheet(path, policy, column_map=None, chunk_size=100_000):
+    """Read and normalize one whole marksheet file
+
+    Returns ``(chunks, report)``: the accepted rows as schema DataFrames of at
+    most ``chunk_size`` rows, and the file's report from ``iter_marksheet``.
+    """
+    report = {}
+    chunks = list(iter_marksheet(path, policy, column_map, chunk_size, report))
+    return chunks, report
+
+
+def _iter_files(paths, policy, column_map, chunk_size, max_workers):
+    """Yield (chunks, file_report) per file, in file order
+
+    Run in this process, each file's chunks are streamed as they are read.
+    In a process pool, at most ``max_workers`` files are parsed (and held)
+    at a time, so memory depends on the file sizes, not the total input.
+    """
+    if max_workers == 1 or len(paths) <= 1:
+        for path in paths:
+            file_report = {}
+            yield iter_marksheet(path, policy, column_map, chunk_size, file_report), file_report
+        return
+    window = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=window) as pool:
+        pending = deque()
+        try:
+            for path in paths:
+                pending.append(pool.submit(parse_marksheet, path, policy, column_map, chunk_size))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_marksheets(paths, policy=None, column_map=None, chunk_size=100_000, max_workers=None, report=None):
+    """Yield the accepted rows of every file, in file order, as schema DataFrames
+
+    Files are parsed in parallel (unless ``max_workers`` is 1), with at most
+    ``max_workers`` of them in flight. Ids already accepted from an earlier
+    file are rejected as duplicates. When a ``report`` dict is given it is
+    filled in as files complete; see ``ingest_marksheets``.
+    """
+    policy = policy or get_policy()
+    report = {} if report is None else report
+    report.update({'files': [], 'rows_read': 0, 'rows_accepted': 0,
+                   'rejected': dict.fromkeys(REJECT_REASONS, 0)})
+    start = time.perf_counter()
+    try:
+        seen_ids = set()
+        for chunks, file_report in _iter_files(list(paths), policy, column_map, chunk_size, max_workers):
+            for chunk in chunks:
+                ids = chunk['student_id'].to_numpy()
+                repeated = np.fromiter((value in seen_ids for value in ids), dtype=bool, count=len(ids))
+                if repeated.any():
+                    file_report['rejected']['duplicate_id'] += int(repeated.sum())
+                    file_report['rows_accepted'] -= int(repeated.sum())
+                    chunk = chunk[~repeated].reset_index(drop=True)
+                seen_ids.update(ids[~repeated])
+                if len(chunk):
+                    yield chunk
+            report['files'].append(file_report)
+            report['rows_read'] += file_report['rows_read']
+            report['rows_accepted'] += file_report['rows_accepted']
+            for reason, rows in file_report['rejected'].items():
+                report['rejected'][reason] += rows
+    finally:
+        report['seconds'] = time.perf_counter() - start
+        report['rows_per_second'] = report['rows_read'] / report['seconds'] if report['seconds'] else 0.0
+
+
+def read_marksheets(paths, policy=None, column_map=None, chunk_size=100_000, max_workers=None):
+    """Return ``(df, report)``: every accepted row of ``paths`` as one DataFrame"""
+    report = {}
+    policy = policy or get_policy()
+    chunks = list(iter_marksheets(paths, policy, column_map, chunk_size, max_workers, report))
+    if not chunks:
+        raise ValueError(f"no valid rows in {list(paths)}")
+    data = {}
+    for column, first in chunks[0].items():
+        if isinstance(first.dtype, pd.CategoricalDtype):
+            data[column] = concat_categoricals(
+                [chunk[column].cat.codes.to_numpy() for chunk in chunks],
+                [chunk[column].cat.categories.to_numpy() for chunk in chunks]
+            )
+        elif isinstance(first.dtype, np.dtype):
+            data[column] = np.concatenate([chunk[column].to_numpy() for chunk in chunks])
+        else:
+            data[column] = pd.concat([chunk[column] for chunk in chunks], ignore_index=True).array
+    return pd.DataFrame(data, copy=False), report
+
+
+def ingest_marksheets(store_path, paths, policy=None, column_map=None, chunk_size=100_000, max_workers=None):
+    """Write every accepted row of ``paths`` to a new cohort store
+
+    Returns ``(store, report)``. The report holds ``rows_read``,
+    ``rows_accepted``, ``rejected`` ({reason: rows}), ``seconds`` and
+    ``rows_per_second`` for the whole run, and the same counts per file
+    under ``files``.
+    """
+    policy = policy or get_policy()
+    report = {}
+    metadata = {'source': 'marksheets', 'files': [os.path.basename(path) for path in paths],
+                'grading_policy': policy.name}
+    chunks = iter_marksheets(paths, policy, column_map, chunk_size, max_workers, report)
+    store = write_cohort_store(store_path, chunks, metadata)
+    return store, report
+
+
+def parse_column_map(pairs):
+    """Return {header: column} from "Header=column" strings"""
+    column_map = {}
+    for pair in pairs:
+        header, sep, column = pair.rpartition('=')
+        if not sep:
+            raise ValueError(f"expected HEADER=COLUMN, got {pair!r}")
+        column_map[header] = column
+    return column_map
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest marksheet CSV/Excel files into a cohort store")
+    parser.add_argument('store', help="cohort store directory to write, e.g. data/cohort")
+    parser.add_argument('paths', nargs='+', help="marksheet files (.csv, .xlsx, ...)")
+    parser.add_argument('--map', nargs='*', default=[], metavar='HEADER=COLUMN',
+                        help="map a file header onto a schema column, e.g. 'Roll No=student_id'")
+    parser.add_argument('--institution', help="grade under this institution's policy")
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    store, report = ingest_marksheets(
+        args.store, args.paths, get_policy(args.institution), parse_column_map(args.map),
+        args.chunk_size, args.workers
+    )
+    for file_report in report['files']:
+        rejected = sum(file_report['rejected'].values())
+        print(f"{file_report['path']}: {file_report['rows_accepted']:,} accepted, "
+              f"{rejected:,} rejected in {file_report['seconds']:.2f}s")
+    print(f"Wrote {len(store):,} of {report['rows_read']:,} rows to {args.store} in "
+          f"{report['seconds']:.2f}s ({report['rows_per_second']:,.0f} rows/s)")
+    for reason, rows in report['rejected'].items():
+        if rows:
+            print(f"  rejected {rows:,} rows: {reason}")
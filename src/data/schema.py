@@ -0,0 +1,96 @@
+"""Compact column dtypes for the student table.
+
+Scores fit in ``uint8`` and grade and status repeat a handful of values, so
+storing them as int64/float64/object wastes most of the memory a cohort uses.
+Ids and names are unique keys: as categoricals they would store every value
+again as a category plus a code per row, so they use the ``str`` dtype, which
+pandas backs with one Arrow buffer of characters and offsets. ``apply_schema``
+converts a frame to these dtypes; it is applied when cohorts are generated and
+when they are loaded from a cohort store.
+"""
+import numpy as np
+import pandas as pd
+
+import config
+
+SUBJECT_DTYPE = np.uint8
+KEY_DTYPE = 'str'
+
+
+def student_schema(subjects):
+    """Return the column dtypes of a student table with the given subjects"""
+    return {
+        'student_id': KEY_DTYPE,
+        'name': KEY_DTYPE,
+        **dict.fromkeys(subjects, SUBJECT_DTYPE),
+        'total_marks': np.uint16,
+        # float64: a float32 percentage shows (and grades) as e.g. 97.4000015
+        'percentage': np.float64,
+        'grade': 'category',
+        'status': 'category',
+        'semester': np.uint8,
+        'attendance': np.uint8,
+    }
+
+
+STUDENT_SCHEMA = student_schema(config.SUBJECTS)
+
+
+def apply_schema(df, schema=None):
+    """Return ``df`` with its columns converted to the compact schema dtypes
+
+    Columns missing from the schema are left as they are, and columns that
+    already have the right dtype are not copied.
+    """
+    schema = STUDENT_SCHEMA if schema is None else schema
+    conversions = {}
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        current = df[column].dtype
+        if dtype == 'category':
+            if not isinstance(current, pd.CategoricalDtype):
+                conversions[column] = 'category'
+        elif dtype == KEY_DTYPE:
+            if not isinstance(current, pd.StringDtype):
+                conversions[column] = KEY_DTYPE
+        elif current != np.dtype(dtype):
+            conversions[column] = dtype
+    if not conversions:
+        return df
+    return df.astype(conversions)
+
+
+def concat_categoricals(codes, categories):
+    """Build one Categorical from per-part codes and categories
+
+    Parts that share their categories (grade, status) only need their codes
+    concatenated. Parts with disjoint categories (ids, names) are combined by
+    offsetting the codes, which avoids re-hashing every value the way
+    ``union_categoricals`` would; overlapping categories fall back to it.
+    """
+    if all(np.array_equal(categories[0], other) for other in categories[1:]):
+        dtype = pd.CategoricalDtype(categories[0])
+        return pd.Categorical.from_codes(np.concatenate(codes), dtype=dtype)
+    offsets = np.cumsum([0] + [len(part) for part in categories[:-1]])
+    merged = pd.Index(np.concatenate(categories))
+    if merged.is_unique:
+        code_dtype = np.int32 if len(merged) < 2 ** 31 else np.int64
+        shifted = [np.where(part >= 0, part.astype(code_dtype) + code_dtype(offset), -1) for part, offset in zip(codes, offsets)]
+        return pd.Categorical.from_codes(np.concatenate(shifted), dtype=pd.CategoricalDtype(merged))
+    pieces = [pd.Categorical.from_codes(part, part_categories) for part, part_categories in zip(codes, categories)]
+    return pd.api.types.union_categoricals(pieces)
+
+
+def memory_report(df, schema=None):
+    """Return the bytes used by each column before and after ``apply_schema``
+
+    The result has one row per column plus a ``TOTAL`` row, with the columns
+    ``before``, ``after`` and ``ratio`` (before / after).
+    """
+    before = df.memory_usage(deep=True, index=False)
+    after = apply_schema(df, schema).memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'before': before, 'after': after})
+    report.loc['TOTAL'] = report.sum()
+    report['ratio'] = (report['before'] / report['after']).round(2)
+    return report
@@ -1,23 +1,53 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from random import randint, choice, seed
+from random import Random
 import numpy as np
 
-def generate_students_data(num_students=50):
-    seed(42)  # For reproducibility
+if __name__ == "__main__":
+    SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.extend([SRC_DIR, os.path.dirname(SRC_DIR)])
+
+import config
+from analysis.aggregation import aggregate_cohort, summarize
+from analysis.grading import get_policy
+from data.schema import apply_schema, concat_categoricals
+
+# Realistic student names
+STUDENT_NAMES = [
+    'Ankit', 'Priya', 'Rahul', 'Sneha', 'Amit', 'Pooja', 'Vikash', 'Ritu',
+    'Rohit', 'Kavya', 'Arjun', 'Nisha', 'Karan', 'Meera', 'Sanjay', 'Divya',
+    'Abhishek', 'Shreya', 'Deepak', 'Anjali', 'Manish', 'Preeti', 'Suresh', 'Neha',
+    'Aditya', 'Swati', 'Vishal', 'Kritika', 'Rajesh', 'Simran', 'Gaurav', 'Riya',
+    'Harsh', 'Aarti', 'Nikhil', 'Tanya', 'Ashish', 'Varsha', 'Mohit', 'Jyoti',
+    'Sachin', 'Pallavi', 'Vinay', 'Shweta', 'Akash', 'Sonia', 'Raghav', 'Megha',
+    'Dhruv', 'Aditi', 'Ravi', 'Ananya', 'Tarun', 'Kirti', 'Manoj', 'Rashmi'
+]
+
+# Performance profiles used by the vectorized generator, in the same order as
+# the choices made by generate_students_data:
+# (base_score_low, base_score_high, variance_low, variance_high), inclusive
+PERFORMANCE_PROFILES = np.array([
+    [85, 95, 5, 10],   # excellent
+    [70, 85, 5, 15],   # good
+    [60, 75, 5, 15],   # average
+    [45, 65, 5, 15],   # below_average
+])
+
+def generate_students_data(num_students=50, random_state=42, policy=None):
+    # Private generator for reproducibility; safe to call from several threads
+    rng = Random(random_state)
+    
+    # Grades and pass/fail follow the configured grading policy
+    policy = policy or get_policy()
     
     # BCA subjects
-    subjects = ['Mathematics', 'Computer Science', 'Statistics', 'Data Structures', 'Algorithms']
+    subjects = get_subjects()
     
     # Realistic student names
-    student_names = [
-        'Ankit', 'Priya', 'Rahul', 'Sneha', 'Amit', 'Pooja', 'Vikash', 'Ritu',
-        'Rohit', 'Kavya', 'Arjun', 'Nisha', 'Karan', 'Meera', 'Sanjay', 'Divya',
-        'Abhishek', 'Shreya', 'Deepak', 'Anjali', 'Manish', 'Preeti', 'Suresh', 'Neha',
-        'Aditya', 'Swati', 'Vishal', 'Kritika', 'Rajesh', 'Simran', 'Gaurav', 'Riya',
-        'Harsh', 'Aarti', 'Nikhil', 'Tanya', 'Ashish', 'Varsha', 'Mohit', 'Jyoti',
-        'Sachin', 'Pallavi', 'Vinay', 'Shweta', 'Akash', 'Sonia', 'Raghav', 'Megha',
-        'Dhruv', 'Aditi', 'Ravi', 'Ananya', 'Tarun', 'Kirti', 'Manoj', 'Rashmi'
-    ]
+    student_names = list(STUDENT_NAMES)
     
     students_data = []
     
@@ -29,25 +59,25 @@ def generate_students_data(num_students=50):
     for i in range(num_students):
         # Create more realistic score distributions
         # Some students are consistently good, some average, some struggling
-        performance_type = choice(['excellent', 'good', 'average', 'below_average'])
+        performance_type = rng.choice(['excellent', 'good', 'average', 'below_average'])
         
         if performance_type == 'excellent':
-            base_score = randint(85, 95)
-            variance = randint(5, 10)  # Fixed: Always positive
+            base_score = rng.randint(85, 95)
+            variance = rng.randint(5, 10)  # Fixed: Always positive
         elif performance_type == 'good':
-            base_score = randint(70, 85)
-            variance = randint(5, 15)  # Fixed: Always positive
+            base_score = rng.randint(70, 85)
+            variance = rng.randint(5, 15)  # Fixed: Always positive
         elif performance_type == 'average':
-            base_score = randint(60, 75)
-            variance = randint(5, 15)  # Fixed: Always positive
+            base_score = rng.randint(60, 75)
+            variance = rng.randint(5, 15)  # Fixed: Always positive
         else:  # below_average
-            base_score = randint(45, 65)
-            variance = randint(5, 15)  # Fixed: Always positive
+            base_score = rng.randint(45, 65)
+            variance = rng.randint(5, 15)  # Fixed: Always positive
         
         scores = []
         for subject in subjects:
             # Fixed the randint range issue
-            score = base_score + randint(-variance, variance)
+            score = base_score + rng.randint(-variance, variance)
             # Ensure score is within valid range
             score = max(0, min(100, score))
             scores.append(score)
@@ -56,67 +86,227 @@ def generate_students_data(num_students=50):
         total_marks = sum(scores)
         percentage = round(total_marks / len(subjects), 2)
         
-        # Determine grade based on percentage
-        if percentage >= 90:
-            grade = 'A+'
-        elif percentage >= 80:
-            grade = 'A'
-        elif percentage >= 70:
-            grade = 'B+'
-        elif percentage >= 60:
-            grade = 'B'
-        elif percentage >= 50:
-            grade = 'C'
-        else:
-            grade = 'F'
-        
-        # Determine pass/fail status
-        status = 'Pass' if all(score >= 35 for score in scores) and percentage >= 40 else 'Fail'
+        # Determine grade and pass/fail status
+        grade = policy.grade_of(percentage)
+        status = policy.status_of(scores, percentage)
         
         student = {
             'student_id': f'BCA{2024:04d}{i+1:03d}',
             'name': student_names[i],
-            'Mathematics': scores[0],
-            'Computer Science': scores[1],
-            'Statistics': scores[2],
-            'Data Structures': scores[3],
-            'Algorithms': scores[4],
+            **dict(zip(subjects, scores)),
             'total_marks': total_marks,
             'percentage': percentage,
             'grade': grade,
             'status': status,
-            'semester': choice([1, 2, 3, 4, 5, 6]),
-            'attendance': randint(65, 98)
+            'semester': rng.choice([1, 2, 3, 4, 5, 6]),
+            'attendance': rng.randint(65, 98)
         }
         
         students_data.append(student)
     
     return students_data
 
-def get_dataframe(num_students=50):
-    """Return student data as pandas DataFrame"""
-    data = generate_students_data(num_students)
-    return pd.DataFrame(data)
+def generate_students_frame(num_students=50, random_state=42, start=0, policy=None):
+    """Return a vectorized student cohort as a pandas DataFrame.
+
+    Draws the same distributions as ``generate_students_data`` (performance
+    type, base score, variance, per-subject scores, semester, attendance) as
+    NumPy arrays instead of one Python dict per student, so million-row
+    cohorts take seconds rather than minutes. ``random_state`` is a seed or a
+    ``np.random.Generator``; the same seed always gives the same cohort, but
+    not the same rows as the ``random``-based loop version. ``start`` offsets
+    the generated student ids and names, for cohorts built in pieces.
+    Grades and pass/fail come from ``policy`` (the configured one by default).
+    """
+    rng = np.random.default_rng(random_state)
+    subjects = get_subjects()
+    n = num_students
+
+    performance_type = rng.integers(0, len(PERFORMANCE_PROFILES), size=n)
+    profile = PERFORMANCE_PROFILES[performance_type]
+    base_score = rng.integers(profile[:, 0], profile[:, 1] + 1)
+    variance = rng.integers(profile[:, 2], profile[:, 3] + 1)
+
+    offsets = rng.integers(-variance[:, None], variance[:, None] + 1, size=(n, len(subjects)))
+    scores = np.clip(base_score[:, None] + offsets, 0, 100)
+
+    total_marks = scores.sum(axis=1)
+    percentage = np.round(total_marks / len(subjects), 2)
+
+    policy = policy or get_policy()
+    grade = policy.grades(percentage)
+    status = policy.statuses(scores, percentage)
+
+    semester = rng.integers(1, 7, size=n)
+    attendance = rng.integers(65, 99, size=n)
+
+    # Ids and names are unique keys; apply_schema stores them as strings
+    index = np.arange(start, start + n)
+    numbers = (index + 1).astype(str)
+    student_id = np.char.add(f'BCA{2024:04d}', np.char.zfill(numbers, 3)).astype(object)
+    name = np.char.add('Student_', numbers).astype(object)
+    named = index < len(STUDENT_NAMES)
+    name[named] = np.asarray(STUDENT_NAMES, dtype=object)[index[named]]
+
+    data = {
+        'student_id': student_id,
+        'name': name,
+    }
+    for i, subject in enumerate(subjects):
+        data[subject] = scores[:, i]
+    data.update({
+        'total_marks': total_marks,
+        'percentage': percentage,
+        'grade': grade,
+        'status': status,
+        'semester': semester,
+        'attendance': attendance,
+    })
+    return apply_schema(pd.DataFrame(data))
+
+def get_dataframe(num_students=50, vectorized=False, random_state=42):
+    """Return student data as pandas DataFrame
+
+    With ``vectorized=True`` the cohort comes from ``generate_students_frame``,
+    which is the one to use for large cohorts. Either way the columns use the
+    compact dtypes of ``data.schema.STUDENT_SCHEMA``.
+    """
+    if vectorized:
+        return generate_students_frame(num_students, random_state)
+    data = generate_students_data(num_students, random_state)
+    return apply_schema(pd.DataFrame(data))
+
+def chunk_random_state(random_state, chunk_index):
+    """Return the NumPy generator for one chunk of a seeded cohort
+
+    The stream depends only on the cohort seed and the chunk index (it is the
+    ``chunk_index``-th child of ``SeedSequence(random_state)``), so chunk k is
+    the same whether or not chunks 0..k-1 were ever generated.
+    """
+    return np.random.default_rng(np.random.SeedSequence(random_state, spawn_key=(chunk_index,)))
+
+def iter_dataframe_chunks(num_students, chunk_size=100_000, random_state=42, start_chunk=0):
+    """Yield a cohort of ``num_students`` as DataFrames of ``chunk_size`` rows
+
+    Only one chunk is held in memory at a time. Each chunk is seeded
+    independently via ``chunk_random_state`` and carries its global student
+    ids, so generation can start (or resume) at any ``start_chunk``.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    num_chunks = -(-num_students // chunk_size)
+    for chunk_index in range(start_chunk, num_chunks):
+        yield generate_chunk(num_students, chunk_size, random_state, chunk_index)
+
+def generate_chunk(num_students, chunk_size, random_state, chunk_index):
+    """Return chunk ``chunk_index`` of a chunked cohort as a DataFrame"""
+    start = chunk_index * chunk_size
+    size = min(chunk_size, num_students - start)
+    return generate_students_frame(size, chunk_random_state(random_state, chunk_index), start=start)
+
+def write_cohort_chunks(directory, num_students, chunk_size=100_000, random_state=42):
+    """Stream a generated cohort to ``directory`` as one CSV file per chunk
+
+    Chunks are written as ``part-00000.csv``, ``part-00001.csv``, ... next to
+    a ``cohort.json`` manifest. Each part is written to a temporary file and
+    renamed when complete, so calling this again with the same parameters
+    after an interruption skips the finished parts and resumes from the first
+    missing one. Returns the list of part paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = {'num_students': num_students, 'chunk_size': chunk_size, 'random_state': random_state}
+    manifest_path = os.path.join(directory, 'cohort.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            existing = json.load(f)
+        if existing != manifest:
+            raise ValueError(f"{directory} holds a different cohort: {existing}")
+    else:
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+
+    num_chunks = -(-num_students // chunk_size)
+    paths = [os.path.join(directory, f'part-{k:05d}.csv') for k in range(num_chunks)]
+    for chunk_index, path in enumerate(paths):
+        if os.path.exists(path):
+            continue
+        chunk = generate_chunk(num_students, chunk_size, random_state, chunk_index)
+        chunk.to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+    return paths
+
+# Default shard size of generate_students_parallel. The shards, and so the
+# cohort, depend only on the cohort size, never on the host's CPU count.
+PARALLEL_SHARD_SIZE = 100_000
+
+def _generate_shard(args):
+    """Generate one shard in a worker process and return its raw columns"""
+    num_students, shard_size, random_state, shard_index = args
+    chunk = generate_chunk(num_students, shard_size, random_state, shard_index)
+    columns = {}
+    for name in chunk.columns:
+        column = chunk[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            columns[name] = (column.cat.codes.to_numpy(), column.cat.categories.to_numpy())
+        elif isinstance(column.dtype, np.dtype):
+            columns[name] = column.to_numpy()
+        else:
+            # Strings (ids, names) stay Arrow arrays, which pickle compactly
+            columns[name] = column.array
+    return columns
+
+def generate_students_parallel(num_students, random_state=42, num_shards=None, max_workers=None):
+    """Generate a cohort in a process pool, one shard per task
+
+    The cohort is split into ``num_shards`` contiguous shards, which are
+    exactly the chunks of ``iter_dataframe_chunks`` with ``chunk_size =
+    ceil(num_students / num_shards)``, each with its own ``SeedSequence`` child
+    stream. By default the shards are chunks of ``PARALLEL_SHARD_SIZE``
+    students. The result is therefore identical for the same seed and shard
+    count, whatever ``max_workers`` (and the machine's CPU count) is. Each
+    column is copied once, from the shard results into its final array.
+    """
+    if num_shards is None:
+        shard_size = PARALLEL_SHARD_SIZE
+    else:
+        shard_size = max(1, -(-num_students // num_shards))
+    num_shards = -(-num_students // shard_size) if num_students else 0
+    tasks = [(num_students, shard_size, random_state, k) for k in range(num_shards)]
+    if not tasks:
+        return generate_students_frame(0, random_state)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        shards = list(executor.map(_generate_shard, tasks))
+
+    data = {}
+    for name, first in shards[0].items():
+        if isinstance(first, tuple):
+            data[name] = concat_categoricals(
+                [shard[name][0] for shard in shards],
+                [shard[name][1] for shard in shards]
+            )
+        elif isinstance(first, np.ndarray):
+            data[name] = np.concatenate([shard[name] for shard in shards])
+        else:
+            data[name] = pd.concat([pd.Series(shard[name], copy=False) for shard in shards],
+                                   ignore_index=True).array
+    del shards
+    return pd.DataFrame(data, copy=False)
 
 def get_subjects():
     """Return list of BCA subjects"""
-    return ['Mathematics', 'Computer Science', 'Statistics', 'Data Structures', 'Algorithms']
+    return list(config.SUBJECTS)
 
-def get_summary_stats(df):
-    """Return summary statistics for the dataset"""
-    subjects = get_subjects()
-    
-    stats = {
-        'total_students': len(df),
-        'pass_rate': round((df['status'] == 'Pass').sum() / len(df) * 100, 2),
-        'average_percentage': round(df['percentage'].mean(), 2),
-        'highest_scorer': df.loc[df['percentage'].idxmax(), 'name'],
-        'lowest_scorer': df.loc[df['percentage'].idxmin(), 'name'],
-        'subject_averages': {subject: round(df[subject].mean(), 2) for subject in subjects},
-        'grade_distribution': df['grade'].value_counts().to_dict()
-    }
-    
-    return stats
+def get_summary_stats(df, policy=None):
+    """Return summary statistics for the dataset
+
+    Computed in one pass by ``analysis.aggregation``; besides the headline
+    figures this includes per-subject and percentage statistics, so callers
+    do not need to rescan the frame. Subjects are those of ``policy`` (the
+    configured one by default).
+    """
+    policy = policy or get_policy()
+    return summarize(aggregate_cohort(df, policy.subjects), policy)
 
 if __name__ == "__main__":
     # Generate and display sample data
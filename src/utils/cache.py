@@ -0,0 +1,127 @@
+"""In-process LRU cache with TTL and memory cap for the dashboard.
+
+Streamlit reruns the whole script on every widget interaction. The dashboard
+keeps one ``LRUCache`` per server process (see ``get_dashboard_cache`` in
+``app.py``) holding cohorts, summary stats and figures under keys built from
+the inputs they depend on, so a rerun only recomputes the parts of the page
+whose inputs actually changed.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_nbytes(value):
+    """Return an approximate in-memory size of a cached value in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(getattr(value, 'nbytes', None), int):
+        # Indexes and accumulators that report their own size
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    if hasattr(value, 'data') and hasattr(value, 'layout'):
+        # Plotly figure: dominated by the arrays held in its traces
+        total = 0
+        for trace in value.data:
+            for key in ('x', 'y', 'z', 'r', 'values', 'text', 'customdata'):
+                array = getattr(trace, key, None)
+                if array is not None:
+                    total += estimate_nbytes(np.asarray(array))
+        return total + 4096
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with optional TTL and memory cap
+
+    Entries are evicted when there are more than ``max_entries`` of them, when
+    their estimated sizes add up to more than ``max_bytes``, or once they are
+    older than ``ttl`` seconds. A single value larger than ``max_bytes`` is
+    returned to the caller but not kept.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=None, ttl=None, sizeof=estimate_nbytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, nbytes, created_at)
+        self._nbytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, or ``default``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` and evict entries over the limits"""
+        nbytes = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes, time.monotonic())
+            self._nbytes += nbytes
+            self._evict()
+
+    def get_or_compute(self, key, compute, *args, **kwargs):
+        """Return the cached value for ``key``, computing and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute(*args, **kwargs)
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _remove(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._nbytes -= nbytes
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._nbytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self._entries)))
+
+
+_MISSING = object()
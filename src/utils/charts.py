@@ -1,10 +1,11 @@
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
+
+# matplotlib and Plotly are imported by the functions that draw with them, so
+# importing this module (and the dashboard) does not load either of them
 
 def plot_bar_chart(data, title, xlabel, ylabel):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 6))
     plt.bar(data['Student'], data['Score'], color='skyblue')
     plt.title(title)
@@ -15,6 +16,7 @@ def plot_bar_chart(data, title, xlabel, ylabel):
     plt.show()
 
 def plot_pie_chart(data, title):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(8, 8))
     plt.pie(data['Score'], labels=data['Student'], autopct='%1.1f%%', startangle=140)
     plt.title(title)
@@ -22,6 +24,7 @@ def plot_pie_chart(data, title):
     plt.show()
 
 def plot_line_graph(data, title, xlabel, ylabel):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 6))
     plt.plot(data['Student'], data['Score'], marker='o', linestyle='-', color='orange')
     plt.title(title)
@@ -34,25 +37,189 @@ def plot_line_graph(data, title, xlabel, ylabel):
 # Streamlit-compatible chart functions
 def create_streamlit_bar_chart(data, x_col, y_col, title):
     """Create a Plotly bar chart for Streamlit"""
+    import plotly.express as px
     fig = px.bar(data, x=x_col, y=y_col, title=title)
     return fig
 
 def create_streamlit_pie_chart(values, names, title):
     """Create a Plotly pie chart for Streamlit"""
+    import plotly.express as px
     fig = px.pie(values=values, names=names, title=title)
     return fig
 
 def create_streamlit_line_chart(data, x_col, y_col, title):
     """Create a Plotly line chart for Streamlit"""
+    import plotly.express as px
     fig = px.line(data, x=x_col, y=y_col, title=title, markers=True)
     return fig
 
-def create_streamlit_scatter_plot(data, x_col, y_col, color_col, title):
-    """Create a Plotly scatter plot for Streamlit"""
+def create_streamlit_scatter_plot(data, x_col, y_col, color_col, title, point_budget=None):
+    """Create a Plotly scatter plot for Streamlit
+
+    With a ``point_budget``, frames larger than the budget are drawn from a
+    stratified sample with WebGL (see ``create_sampled_scatter_plot``).
+    """
+    import plotly.express as px
+    if point_budget is not None and len(data) > point_budget:
+        return create_sampled_scatter_plot(data, x_col, y_col, color_col, title, point_budget)
     fig = px.scatter(data, x=x_col, y=y_col, color=color_col, title=title)
     return fig
 
 def create_streamlit_heatmap(data, title):
     """Create a Plotly heatmap for Streamlit"""
+    import plotly.express as px
     fig = px.imshow(data, title=title, color_continuous_scale='viridis')
-    return fig
\ No newline at end of file
+    return fig
+
+# Level-of-detail helpers for large cohorts
+#
+# Plotly serializes every point it is given, so figures built from raw rows
+# grow with the cohort. These helpers bound the payload: histograms and box
+# plots are computed server-side and only their bins/quantiles are sent, and
+# scatter/violin plots are drawn from a stratified sample of at most
+# ``point_budget`` rows (config.CHART_POINT_BUDGET by default).
+
+DEFAULT_POINT_BUDGET = 20_000
+
+
+def _group_quotas(counts, point_budget):
+    """Split ``point_budget`` rows over groups of ``counts`` rows (largest remainder)
+
+    Every non-empty group gets one row first, while the budget allows, and
+    the rest is shared in proportion to the remaining rows of each group.
+    The quotas add up to ``point_budget`` when there are that many rows.
+    """
+    quota = np.zeros(len(counts), dtype=np.int64)
+    present = np.flatnonzero(counts)
+    if len(present) >= point_budget:
+        # Too many groups for one row each: the largest groups get theirs
+        quota[present[np.argsort(-counts[present], kind='stable')[:point_budget]]] = 1
+        return quota
+    quota[present] = 1
+    rest = counts - quota
+    spare = point_budget - len(present)
+    if spare <= 0 or rest.sum() == 0:
+        return quota
+    share = rest * spare / rest.sum()
+    quota += np.floor(share).astype(np.int64)
+    left = point_budget - int(quota.sum())
+    quota[np.argsort(-(share - np.floor(share)), kind='stable')[:left]] += 1
+    return np.minimum(quota, counts)
+
+
+def stratified_sample(data, by=None, point_budget=DEFAULT_POINT_BUDGET, random_state=0):
+    """Return at most ``point_budget`` rows of ``data``, keeping group proportions
+
+    Each group of ``by`` keeps a share of the budget proportional to its size,
+    and at least one row, so small groups (e.g. failing students) stay
+    visible. Rows keep their original order.
+    """
+    n = len(data)
+    if n <= point_budget:
+        return data
+    rng = np.random.default_rng(random_state)
+    if by is None:
+        keep = np.sort(rng.choice(n, size=point_budget, replace=False))
+        return data.iloc[keep]
+    codes, uniques = pd.factorize(data[by], sort=False)
+    counts = np.bincount(codes + 1, minlength=len(uniques) + 1)
+    quota = _group_quotas(counts, point_budget)
+    # Rank rows within their group in random order, keep the first quota of each
+    order = np.lexsort((rng.random(n), codes))
+    group_start = np.concatenate([[0], np.cumsum(counts)])[codes[order] + 1]
+    rank = np.arange(n) - group_start
+    keep = np.sort(order[rank < quota[codes[order] + 1]])
+    return data.iloc[keep]
+
+
+def create_binned_histogram(values, nbins, title, x_label=None, color='skyblue'):
+    """Create a histogram whose bins are counted server-side
+
+    Only ``nbins`` bar heights are sent to the browser, whatever the number
+    of values.
+    """
+    import plotly.graph_objects as go
+    values = np.asarray(values, dtype=np.float64)
+    counts, edges = np.histogram(values, bins=nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=color,
+        name='count'
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title='count', bargap=0)
+    return fig
+
+
+def create_quantile_box_plot(groups, title, x_label=None, y_label=None):
+    """Create a box plot from per-group quantiles instead of raw values
+
+    ``groups`` maps each box label to its values. Whiskers end at the most
+    extreme values within 1.5 IQR of the quartiles, as in Plotly's own box
+    plots; individual outliers are not drawn.
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    palette = px.colors.qualitative.Plotly
+    for i, (label, values) in enumerate(groups.items()):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            continue
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        lower = values[values >= q1 - 1.5 * iqr].min()
+        upper = values[values <= q3 + 1.5 * iqr].max()
+        fig.add_trace(go.Box(
+            x=[label],
+            q1=[q1], median=[median], q3=[q3],
+            lowerfence=[lower], upperfence=[upper],
+            name=str(label),
+            marker_color=palette[i % len(palette)]
+        ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label)
+    return fig
+
+
+def create_density_heatmap(data, x_col, y_col, title, bins=50):
+    """Create a 2-D density plot binned server-side with ``np.histogram2d``"""
+    import plotly.graph_objects as go
+    counts, x_edges, y_edges = np.histogram2d(data[x_col], data[y_col], bins=bins)
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=counts.T,
+        colorscale='viridis',
+        colorbar=dict(title='students')
+    ))
+    fig.update_layout(title=title, xaxis_title=x_col, yaxis_title=y_col)
+    return fig
+
+
+def create_sampled_scatter_plot(data, x_col, y_col, color_col, title,
+                                point_budget=DEFAULT_POINT_BUDGET, hover_data=None):
+    """Create a scatter plot of at most ``point_budget`` points
+
+    Larger frames are stratified-sampled by ``color_col`` and drawn with
+    WebGL (``scattergl``).
+    """
+    import plotly.express as px
+    sample = stratified_sample(data, color_col, point_budget)
+    fig = px.scatter(
+        sample, x=x_col, y=y_col, color=color_col, title=title, hover_data=hover_data,
+        render_mode='webgl' if len(data) > point_budget else 'auto'
+    )
+    if len(sample) < len(data):
+        fig.update_layout(title=f"{title} (sample of {len(sample):,} / {len(data):,})")
+    return fig
+
+
+def create_sampled_violin_plot(data, x_col, y_col, title, point_budget=DEFAULT_POINT_BUDGET):
+    """Create a violin plot from a stratified sample of at most ``point_budget`` rows"""
+    import plotly.express as px
+    sample = stratified_sample(data[[x_col, y_col]], x_col, point_budget)
+    fig = px.violin(sample, x=x_col, y=y_col, title=title, box=True)
+    if len(sample) < len(data):
+        fig.update_layout(title=f"{title} (sample of {len(sample):,} / {len(data):,})")
+    return fig
@@ -0,0 +1,205 @@
+"""Pure figure-spec layer shared by the dashboard and batch reports.
+
+Every dashboard figure has a ``build_*`` function taking only precomputed
+inputs (counts, statistics, frames) and returning a Plotly figure, with no
+Streamlit calls. ``compute_aggregates`` derives the shared per-cohort
+aggregates once, and ``FIGURES`` maps each figure name to the function that
+builds it from those aggregates, so the app and ``batch_report.py`` render
+identical figures. Plotly is imported by the builders themselves, the first
+time a figure is built, not when this module is imported.
+"""
+import time
+
+import pandas as pd
+
+from analysis.covariance import CovarianceAccumulator
+from analysis.cube import PerformanceCube
+from data.students_data import get_summary_stats
+from utils.charts import (
+    DEFAULT_POINT_BUDGET,
+    create_binned_histogram,
+    create_quantile_box_plot,
+    create_sampled_scatter_plot,
+    create_sampled_violin_plot,
+)
+
+
+def compute_aggregates(df, subjects, policy=None):
+    """Return the cohort with every aggregate the figures are built from"""
+    return {
+        'df': df,
+        'subjects': list(subjects),
+        'stats': get_summary_stats(df, policy),
+        'cube': PerformanceCube.from_frame(df, subjects, policy=policy),
+        'covariance': CovarianceAccumulator.from_frame(df, subjects),
+    }
+
+
+def build_grade_pie(grade_counts):
+    import plotly.express as px
+    grade_counts = {grade: count for grade, count in grade_counts.items() if count > 0}
+    return px.pie(
+        values=list(grade_counts.values()),
+        names=list(grade_counts.keys()),
+        title="Student Grade Distribution",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+
+
+def build_status_bar(status_counts):
+    import plotly.express as px
+    status_counts = dict(status_counts)
+    return px.bar(
+        x=list(status_counts.keys()),
+        y=list(status_counts.values()),
+        title="Pass/Fail Distribution",
+        color=list(status_counts.keys()),
+        color_discrete_map={'Pass': 'green', 'Fail': 'red'}
+    )
+
+
+def build_percentage_histogram(df, stats):
+    fig_hist = create_binned_histogram(
+        df['percentage'],
+        nbins=20,
+        title="Distribution of Student Percentages",
+        x_label='percentage'
+    )
+    mean_percentage = stats['percentage_stats']['mean']
+    fig_hist.add_vline(x=mean_percentage, line_dash="dash", line_color="red", 
+                      annotation_text=f"Mean: {mean_percentage:.1f}%")
+    return fig_hist
+
+
+def build_subject_box(df, subjects):
+    fig_box = create_quantile_box_plot(
+        {subject: df[subject].to_numpy() for subject in subjects},
+        title="Score Distribution by Subject",
+        x_label='Subject',
+        y_label='Score'
+    )
+    fig_box.update_layout(xaxis_tickangle=45)
+    return fig_box
+
+
+def build_subject_average_bar(stats):
+    import plotly.express as px
+    avg_scores = pd.Series(stats['subject_averages']).sort_values(ascending=True)
+    return px.bar(
+        x=avg_scores.values,
+        y=avg_scores.index,
+        orientation='h',
+        title="Average Scores by Subject",
+        color=avg_scores.values,
+        color_continuous_scale='viridis'
+    )
+
+
+def build_correlation_heatmap(correlation_matrix):
+    import plotly.express as px
+    return px.imshow(
+        correlation_matrix,
+        title="Subject Score Correlations",
+        color_continuous_scale='RdBu',
+        aspect='auto'
+    )
+
+
+def build_radar(names, scores, subjects):
+    import plotly.graph_objects as go
+    fig_radar = go.Figure()
+    
+    for name, student_scores in zip(names, scores):
+        fig_radar.add_trace(go.Scatterpolar(
+            r=student_scores,
+            theta=subjects,
+            fill='toself',
+            name=name
+        ))
+    
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )),
+        showlegend=True,
+        title="Student Performance Radar Chart"
+    )
+    return fig_radar
+
+
+def build_attendance_scatter(df, point_budget=DEFAULT_POINT_BUDGET):
+    return create_sampled_scatter_plot(
+        df, 
+        'attendance', 
+        'percentage',
+        'grade',
+        title="Attendance vs Academic Performance",
+        point_budget=point_budget,
+        hover_data=['name']
+    )
+
+
+def build_semester_line(semester_means):
+    import plotly.express as px
+    semester_avg = semester_means.dropna().rename_axis('semester').reset_index(name='percentage')
+    return px.line(
+        semester_avg, 
+        x='semester', 
+        y='percentage',
+        title="Average Performance by Semester",
+        markers=True
+    )
+
+
+def build_grade_violin(df, point_budget=DEFAULT_POINT_BUDGET):
+    return create_sampled_violin_plot(
+        df,
+        'grade',
+        'percentage',
+        title="Percentage Distribution by Grade",
+        point_budget=point_budget
+    )
+
+
+def build_difficulty_bar(subject_std):
+    import plotly.express as px
+    subject_difficulty = subject_std.sort_values(ascending=False)
+    return px.bar(
+        x=subject_difficulty.values,
+        y=subject_difficulty.index,
+        orientation='h',
+        title="Subject Difficulty (Standard Deviation)",
+        color=subject_difficulty.values,
+        color_continuous_scale='Reds'
+    )
+
+
+# name -> function of the aggregates from ``compute_aggregates``
+FIGURES = {
+    'grade_pie': lambda a: build_grade_pie(a['cube'].counts('grade')),
+    'status_bar': lambda a: build_status_bar(a['cube'].counts('status')),
+    'percentage_histogram': lambda a: build_percentage_histogram(a['df'], a['stats']),
+    'subject_box': lambda a: build_subject_box(a['df'], a['subjects']),
+    'subject_average_bar': lambda a: build_subject_average_bar(a['stats']),
+    'correlation_heatmap': lambda a: build_correlation_heatmap(a['covariance'].correlation()),
+    'attendance_scatter': lambda a: build_attendance_scatter(a['df'], a.get('point_budget', DEFAULT_POINT_BUDGET)),
+    'semester_line': lambda a: build_semester_line(a['cube'].mean('semester')),
+    'grade_violin': lambda a: build_grade_violin(a['df'], a.get('point_budget', DEFAULT_POINT_BUDGET)),
+    'difficulty_bar': lambda a: build_difficulty_bar(a['covariance'].std()),
+}
+
+
+def build_figures(aggregates, names=None):
+    """Build the named figures (all by default)
+
+    Returns ``(figures, seconds)``: figure name -> figure, and figure name ->
+    build time in seconds.
+    """
+    figures, seconds = {}, {}
+    for name in names or FIGURES:
+        start = time.perf_counter()
+        figures[name] = FIGURES[name](aggregates)
+        seconds[name] = time.perf_counter() - start
+    return figures, seconds
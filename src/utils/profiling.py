@@ -0,0 +1,180 @@
+"""Opt-in timing instrumentation for dashboard renders.
+
+A ``RenderProfiler`` is created per page render. It times named stages
+(``with profiler.stage('load'):``) and wrapped functions such as
+``get_dataframe``, ``get_summary_stats`` and each figure builder, records the
+JSON payload size of every figure sent to the browser, and the process peak
+RSS. ``ProfileHistory`` keeps the last renders of the server process to report
+p50/p95 per stage, logs each render as one JSON line and can rewrite a
+Prometheus text file. When profiling is off ``NullProfiler`` does nothing.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger('dashboard.profile')
+
+
+def peak_rss_bytes():
+    """Return the peak resident set size of this process in bytes (None if unknown)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def figure_payload_bytes(fig):
+    """Return the size of the JSON Plotly sends to the browser for ``fig``"""
+    return len(fig.to_json())
+
+
+def log_to_stderr(level=logging.INFO):
+    """Send the per-render JSON lines to stderr, once per process"""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+
+
+class NullProfiler:
+    """Profiler used when instrumentation is off; every call is a no-op"""
+
+    enabled = False
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def wrap(self, name, func):
+        return func
+
+    def record_payload(self, name, nbytes):
+        pass
+
+
+class RenderProfiler:
+    """Stage timings and figure payload sizes of one page render"""
+
+    enabled = True
+
+    def __init__(self):
+        self.started = time.time()
+        self.seconds = {}
+        self.payload_bytes = {}
+        self._start = time.perf_counter()
+
+    def _add(self, name, seconds):
+        # Stages entered more than once in a render add up
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - start)
+
+    def wrap(self, name, func):
+        """Return ``func`` timed as stage ``name`` whenever it is called"""
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return timed
+
+    def record_payload(self, name, nbytes):
+        """Record the JSON size of figure ``name`` (see ``figure_payload_bytes``)"""
+        self.payload_bytes[name] = nbytes
+
+    def finish(self):
+        """Return this render as a flat record for logs and the history"""
+        return {
+            'timestamp': self.started,
+            'total_seconds': time.perf_counter() - self._start,
+            'seconds': dict(self.seconds),
+            'payload_bytes': dict(self.payload_bytes),
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+
+
+class ProfileHistory:
+    """The most recent render records of the server process"""
+
+    def __init__(self, max_renders=200, metrics_file=None):
+        self.records = deque(maxlen=max_renders)
+        self.metrics_file = metrics_file
+        self.renders = 0
+        self._lock = threading.RLock()
+
+    def add(self, record):
+        """Store, log and export one render record"""
+        logger.info(json.dumps(record, sort_keys=True))
+        with self._lock:
+            self.records.append(record)
+            self.renders += 1
+            if self.metrics_file:
+                self.write_prometheus(self.metrics_file)
+
+    def quantiles(self, quantiles=(0.5, 0.95)):
+        """Return {stage: {quantile: seconds}} over the stored renders
+
+        Renders where a stage did not run (e.g. a cache hit) are left out of
+        that stage's quantiles. ``total`` is the whole render.
+        """
+        with self._lock:
+            records = list(self.records)
+        samples = {'total': [record['total_seconds'] for record in records]}
+        for record in records:
+            for name, seconds in record['seconds'].items():
+                samples.setdefault(name, []).append(seconds)
+        return {
+            name: dict(zip(quantiles, np.quantile(values, quantiles)))
+            for name, values in samples.items() if values
+        }
+
+    def prometheus_text(self):
+        """Return the metrics in the Prometheus text exposition format"""
+        lines = [
+            '# HELP dashboard_renders_total Dashboard renders profiled by this process.',
+            '# TYPE dashboard_renders_total counter',
+            f'dashboard_renders_total {self.renders}',
+            '# HELP dashboard_stage_seconds Render stage duration over recent renders.',
+            '# TYPE dashboard_stage_seconds summary',
+        ]
+        for name, values in sorted(self.quantiles().items()):
+            for quantile, seconds in values.items():
+                lines.append(f'dashboard_stage_seconds{{stage="{name}",quantile="{quantile}"}} {seconds:.6f}')
+        last = self.records[-1] if self.records else None
+        if last:
+            lines += [
+                '# HELP dashboard_figure_payload_bytes JSON size of each figure in the last render.',
+                '# TYPE dashboard_figure_payload_bytes gauge',
+            ]
+            for name, size in sorted(last['payload_bytes'].items()):
+                lines.append(f'dashboard_figure_payload_bytes{{figure="{name}"}} {size}')
+            if last['peak_rss_bytes'] is not None:
+                lines += [
+                    '# HELP dashboard_peak_rss_bytes Peak resident memory of the server process.',
+                    '# TYPE dashboard_peak_rss_bytes gauge',
+                    f"dashboard_peak_rss_bytes {last['peak_rss_bytes']}",
+                ]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Rewrite ``path`` atomically, e.g. for the node exporter textfile collector"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
@@ -0,0 +1,32 @@
+import os
+
+from data.cohort_registry import CohortRegistry
+from data.cohort_store import generate_cohort_store, open_cohort_store
+from data.students_data import generate_students_frame
+
+
+def test_evicted_cohorts_leave_no_spill_store(tmp_path):
+    spill_dir = tmp_path / 'spill'
+    spill_dir.mkdir()
+    registry = CohortRegistry(max_bytes=0, spill_dir=str(spill_dir))
+    for size in (100, 200, 300):
+        lease = registry.lease(('generated', size), generate_students_frame, size)
+        assert len(lease.frame) == size
+        assert len(os.listdir(spill_dir)) == 1
+        lease.release()
+    assert len(registry) == 0
+    assert os.listdir(spill_dir) == []
+
+
+def test_stored_cohorts_are_not_spilled(tmp_path):
+    store_path = str(tmp_path / 'store')
+    generate_cohort_store(store_path, 500, chunk_size=200)
+    spill_dir = tmp_path / 'spill'
+    spill_dir.mkdir()
+    registry = CohortRegistry(spill_dir=str(spill_dir))
+    store = open_cohort_store(store_path)
+    for start in (0, 100, 300):
+        lease = registry.lease(('store', start), store.read, None, start, start + 100, spill=False)
+        assert len(lease.frame) == 100
+    assert len(registry) == 3
+    assert os.listdir(spill_dir) == []
@@ -0,0 +1,28 @@
+import numpy as np
+
+from analysis.grading import GradingPolicy, get_policy
+
+FRACTIONAL_SCALE = {"A": 80.25, "B": 60.6, "C": 50.05, "F": 0}
+
+
+def test_grades_match_grade_of_for_every_percentage():
+    policy = get_policy()
+    percentage = np.round(np.arange(0, 10001) / 100, 2)
+    for dtype in (np.float64, np.float32):
+        values = percentage.astype(dtype)
+        expected = [policy.grade_of(value) for value in values]
+        assert list(policy.grades(values)) == expected
+
+
+def test_float32_percentages_on_fractional_bounds():
+    policy = GradingPolicy(FRACTIONAL_SCALE, pass_mark=40.4, subject_pass_mark=35, subjects=["Mathematics"])
+    percentage = np.array([80.25, 80.24, 60.6, 60.59, 50.05, 50.04, 40.4, 40.39], dtype=np.float32)
+    expected = [policy.grade_of(float(value)) for value in np.round(percentage.astype(np.float64), 2)]
+    assert expected == ["A", "B", "B", "C", "C", "F", "F", "F"]
+    assert list(policy.grades(percentage)) == expected
+    assert [policy.grade_of(value) for value in percentage] == expected
+
+    scores = np.full((len(percentage), 1), 100)
+    statuses = [policy.status_of(row, value) for row, value in zip(scores, percentage)]
+    assert list(policy.statuses(scores, percentage)) == statuses
+    assert statuses[-2:] == ["Pass", "Fail"]
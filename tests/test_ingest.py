@@ -0,0 +1,44 @@
+import pytest
+
+from analysis.grading import get_policy
+from data.ingest import read_marksheets
+
+HEADER = 'student_id,name,Mathematics,Computer Science,Statistics,Data Structures,Algorithms,semester,attendance\n'
+
+
+def write_sheet(path, rows):
+    path.write_text(HEADER + ''.join(row + '\n' for row in rows))
+    return str(path)
+
+
+def test_non_numeric_cell_rejects_only_its_row(tmp_path):
+    sheet = write_sheet(tmp_path / 'marks.csv', [
+        'S1,Asha,80,70,60,50,40,1,90',
+        'S2,Ben,5O,70,60,50,40,1,90',
+        'S3,Chen,80,70,60,50,40,2,9x',
+        'S4,Dev,80,70,60,50,AB,3,75',
+    ])
+    df, report = read_marksheets([sheet], get_policy())
+    assert list(df['student_id'].astype(str)) == ['S1']
+    assert report['rejected']['non_numeric'] == 2
+    assert report['rejected']['missing_value'] == 1
+    assert report['rows_read'] == 4
+
+
+@pytest.mark.parametrize('chunk_size', [1, 100])
+def test_rejected_row_does_not_claim_its_id(tmp_path, chunk_size):
+    first = write_sheet(tmp_path / 'first.csv', [
+        'S1,Asha,180,70,60,50,40,1,90',
+        'S1,Asha,80,70,60,50,40,1,90',
+        'S2,Ben,80,70,60,50,40,9,90',
+    ])
+    second = write_sheet(tmp_path / 'second.csv', [
+        'S2,Ben,80,70,60,50,40,2,90',
+        'S1,Asha,75,70,60,50,40,1,90',
+    ])
+    df, report = read_marksheets([first, second], get_policy(), chunk_size=chunk_size, max_workers=1)
+    assert list(df['student_id'].astype(str)) == ['S1', 'S2']
+    assert list(df['Mathematics']) == [80, 80]
+    assert report['rejected']['score_out_of_range'] == 1
+    assert report['rejected']['semester_out_of_range'] == 1
+    assert report['rejected']['duplicate_id'] == 1
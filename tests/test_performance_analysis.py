@@ -0,0 +1,15 @@
+import numpy as np
+
+from analysis.performance_analysis import top_k_indices
+
+
+def test_top_k_indices_on_unsigned_scores():
+    scores = np.array([1, 100, 50, 0], dtype=np.uint8)
+    assert list(top_k_indices(scores, 2)) == [1, 2]
+    assert list(top_k_indices(scores, 2, largest=False)) == [3, 0]
+
+
+def test_top_k_indices_breaks_ties_by_row():
+    scores = np.array([70, 90, 70, 90, 70, 10], dtype=np.uint8)
+    assert list(top_k_indices(scores, 4)) == [1, 3, 0, 2]
+    assert list(top_k_indices(scores, 3, largest=False)) == [5, 0, 2]
@@ -0,0 +1,18 @@
+import pandas as pd
+
+from data.students_data import generate_students_parallel, get_dataframe, iter_dataframe_chunks
+
+
+def test_parallel_cohort_does_not_depend_on_workers():
+    num_students = 150_000
+    expected = pd.concat(list(iter_dataframe_chunks(num_students)), ignore_index=True)
+    for max_workers in (1, 2):
+        df = generate_students_parallel(num_students, max_workers=max_workers)
+        pd.testing.assert_frame_equal(df.astype(str), expected.astype(str))
+
+
+def test_get_dataframe_uses_its_seed():
+    assert get_dataframe(20).equals(get_dataframe(20, random_state=42))
+    assert not get_dataframe(20).equals(get_dataframe(20, random_state=7))
+    assert get_dataframe(20, vectorized=True, random_state=7).equals(get_dataframe(20, vectorized=True, random_state=7))
+    assert not get_dataframe(20, vectorized=True).equals(get_dataframe(20, vectorized=True, random_state=7))